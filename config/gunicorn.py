@@ -0,0 +1,13 @@
+"""Gunicorn settings."""
+
+# Prometheus
+from prometheus_client import multiprocess
+
+# Utilities
+import os
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of an exited worker."""
+    if 'prometheus_multiproc_dir' in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
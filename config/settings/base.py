@@ -24,6 +24,18 @@ DATABASES = {
 }
 DATABASES['default']['ATOMIC_REQUESTS'] = True
 
+# Read replicas
+# Comma separated database URLs, safe-method requests read from them.
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), 1):
+    alias = 'replica_{}'.format(index)
+    DATABASES[alias] = env.db_url_config(url)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_REPLICA_LAG = env.int('DJANGO_DATABASE_REPLICA_LAG', default=5)  # seconds
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['cride.utils.routers.ReplicaRouter']
+
 # URLs
 ROOT_URLCONF = 'config.urls'
 
@@ -52,6 +64,8 @@ LOCAL_APPS = [
     'cride.users.apps.UsersAppConfig',
     'cride.circles.apps.CirclesAppConfig',
     'cride.rides.apps.RidesAppConfig',
+    'cride.exports.apps.ExportsAppConfig',
+    'cride.emails.apps.EmailsAppConfig',
 ]
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
@@ -88,6 +102,25 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+SQL_INSTRUMENTATION = env.bool('DJANGO_SQL_INSTRUMENTATION', default=False)
+SQL_INSTRUMENTATION_HEADERS = env.bool('DJANGO_SQL_INSTRUMENTATION_HEADERS', default=False)
+SQL_SLOW_QUERY_THRESHOLD = env.float('DJANGO_SQL_SLOW_QUERY_THRESHOLD', default=200)  # milliseconds
+if SQL_INSTRUMENTATION:
+    MIDDLEWARE += ['cride.utils.middleware.QueryInstrumentationMiddleware']
+
+# Metrics
+# Set the prometheus_multiproc_dir environment variable to aggregate
+# the metrics of every gunicorn worker and Celery pool process, one
+# directory per container. The metrics of other containers are also
+# exposed when their directories are listed in METRICS_COLLECT_DIRS.
+# /metrics/ answers only to scrapers sending METRICS_TOKEN.
+METRICS_ENABLED = env.bool('DJANGO_METRICS_ENABLED', default=True)
+METRICS_TOKEN = env('DJANGO_METRICS_TOKEN', default='')
+METRICS_COLLECT_DIRS = env.list('DJANGO_METRICS_COLLECT_DIRS', default=[])
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(1, 'cride.utils.middleware.MetricsMiddleware')
+if DATABASE_REPLICAS:
+    MIDDLEWARE += ['cride.utils.middleware.ReplicaRoutingMiddleware']
 
 # Static files
 STATIC_ROOT = str(ROOT_DIR('staticfiles'))
@@ -139,6 +172,15 @@ X_FRAME_OPTIONS = 'DENY'
 
 # Email
 EMAIL_BACKEND = env('DJANGO_EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAILS_BATCH_SIZE = env.int('DJANGO_EMAILS_BATCH_SIZE', default=100)
+EMAILS_DRAIN_INTERVAL = env.int('DJANGO_EMAILS_DRAIN_INTERVAL', default=10)
+EMAILS_DRAIN_TIME = env.int('DJANGO_EMAILS_DRAIN_TIME', default=45)
+EMAILS_MAX_ATTEMPTS = env.int('DJANGO_EMAILS_MAX_ATTEMPTS', default=5)
+# Messages per second allowed by each provider, unlisted backends are not throttled
+EMAILS_RATE_LIMITS = {
+    'django.core.mail.backends.smtp.EmailBackend': 10,
+    'anymail.backends.mailgun.EmailBackend': 50,
+}
 
 # Admin
 ADMIN_URL = 'admin/'
@@ -147,6 +189,30 @@ ADMINS = [
 ]
 MANAGERS = ADMINS
 
+# Users
+USERS_TOKEN_CACHE_TIMEOUT = env.int('DJANGO_USERS_TOKEN_CACHE_TIMEOUT', default=60)
+
+# Circles
+CIRCLES_CACHE_TIMEOUT = env.int('DJANGO_CIRCLES_CACHE_TIMEOUT', default=5 * 60)
+CIRCLES_RESOLVER_MAX_SIZE = env.int('DJANGO_CIRCLES_RESOLVER_MAX_SIZE', default=1024)
+CIRCLES_RESOLVER_TTL = env.int('DJANGO_CIRCLES_RESOLVER_TTL', default=30)
+CIRCLES_MEMBERSHIP_CACHE_TIMEOUT = env.int('DJANGO_CIRCLES_MEMBERSHIP_CACHE_TIMEOUT', default=5 * 60)
+
+# Rides
+RIDES_LIST_CACHE_TIMEOUT = env.int('DJANGO_RIDES_LIST_CACHE_TIMEOUT', default=60)
+RIDES_SWEEP_INTERVAL = env.int('DJANGO_RIDES_SWEEP_INTERVAL', default=5 * 60)
+RIDES_RECOMMENDATIONS_SIZE = env.int('DJANGO_RIDES_RECOMMENDATIONS_SIZE', default=200)
+RIDES_RECOMMENDATIONS_HORIZON = env.int('DJANGO_RIDES_RECOMMENDATIONS_HORIZON', default=7)  # days
+RIDES_RECOMMENDATIONS_CACHE_TIMEOUT = env.int('DJANGO_RIDES_RECOMMENDATIONS_CACHE_TIMEOUT', default=6 * 60 * 60)
+RIDES_RECOMMENDATIONS_REFRESH_INTERVAL = env.int('DJANGO_RIDES_RECOMMENDATIONS_REFRESH_INTERVAL', default=60 * 60)
+RIDES_RECOMMENDATIONS_ACTIVE_DAYS = env.int('DJANGO_RIDES_RECOMMENDATIONS_ACTIVE_DAYS', default=30)
+
+# Exports
+EXPORTS_CHUNK_SIZE = env.int('DJANGO_EXPORTS_CHUNK_SIZE', default=2000)
+EXPORTS_TIME_LIMIT = env.int('DJANGO_EXPORTS_TIME_LIMIT', default=30 * 60)
+EXPORTS_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
+EXPORTS_FILE_STORAGE_OPTIONS = {'location': str(ROOT_DIR('exports'))}
+
 # Celery
 INSTALLED_APPS += ['cride.taskapp.celery.CeleryAppConfig']
 if USE_TZ:
@@ -165,7 +231,7 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'cride.users.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 3,
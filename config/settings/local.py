@@ -25,6 +25,9 @@ CACHES = {
 # Templates
 TEMPLATES[0]['OPTIONS']['debug'] = DEBUG  # NOQA
 
+# Metrics
+METRICS_TOKEN = env('DJANGO_METRICS_TOKEN', default='local')
+
 # Email
 EMAIL_BACKEND = env('DJANGO_EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = 'localhost'
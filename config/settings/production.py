@@ -11,6 +11,8 @@ ALLOWED_HOSTS = env.list('DJANGO_ALLOWED_HOSTS', default=['comparteride.com'])
 DATABASES['default'] = env.db('DATABASE_URL')  # NOQA
 DATABASES['default']['ATOMIC_REQUESTS'] = True  # NOQA
 DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=60)  # NOQA
+for alias in DATABASE_REPLICAS:  # NOQA
+    DATABASES[alias]['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=60)  # NOQA
 
 # Cache
 CACHES = {
@@ -52,6 +54,15 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 MEDIA_URL = f'https://{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com/'
 
+# Exports
+EXPORTS_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+EXPORTS_FILE_STORAGE_OPTIONS = {
+    'default_acl': 'private',
+    'querystring_auth': True,
+    'querystring_expire': 5 * 60,
+    'object_parameters': {'CacheControl': 'private, no-store'},
+}
+
 # Templates
 TEMPLATES[0]['OPTIONS']['loaders'] = [  # noqa F405
     (
@@ -131,6 +142,15 @@ LOGGING = {
             'level': 'ERROR',
             'handlers': ['console', 'mail_admins'],
             'propagate': True
+        },
+        'cride.utils.middleware': {
+            'level': 'WARNING',
+            'handlers': ['console'],
+            'propagate': False
         }
     }
 }
+
+# Metrics
+if METRICS_ENABLED:  # noqa F405
+    METRICS_TOKEN = env('DJANGO_METRICS_TOKEN')
@@ -11,6 +11,13 @@ DEBUG = False
 SECRET_KEY = env("DJANGO_SECRET_KEY", default="7lEaACt4wsCj8JbXYgQLf4BmdG5QbuHTMYUGir2Gc1GHqqb2Pv8w9iXwwlIIviI2")
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
 
+# Databases
+# Replicas mirror the primary through another connection, which can't
+# see the rows of a test transaction. Reads stay on the primary except
+# in the routing tests, which enable the router and middleware.
+DATABASE_ROUTERS = []
+MIDDLEWARE = [name for name in MIDDLEWARE if name != "cride.utils.middleware.ReplicaRoutingMiddleware"]  # NOQA
+
 # Cache
 CACHES = {
     "default": {
@@ -34,7 +41,14 @@ TEMPLATES[0]["OPTIONS"]["loaders"] = [  # NOQA
     )
 ]
 
+# Metrics
+METRICS_TOKEN = "test"
+
 # Email
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 EMAIL_HOST = "localhost"
 EMAIL_PORT = 1025
+
+# Celery
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
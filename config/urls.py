@@ -5,6 +5,8 @@ from django.urls import path, include
 from django.conf.urls.static import static
 from django.contrib import admin
 
+from cride.utils.metrics import metrics_view
+
 
 urlpatterns = [
     # Django Admin
@@ -15,3 +17,8 @@ urlpatterns = [
     path('', include(('cride.rides.urls','rides'), namespace='rides')),
 
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.METRICS_ENABLED:
+    urlpatterns += [
+        path('metrics/', metrics_view, name='metrics'),
+    ]
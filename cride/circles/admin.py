@@ -2,20 +2,24 @@
 
 # Django
 from django.contrib import admin
-from django.http import HttpResponse
+from django.db.models import Count
 
 # Model
 from cride.circles.models import Circle
+from cride.exports.models import ExportJob
 from cride.rides.models import Ride
 
+# Exports
+from cride.exports.admin import ExportJobAdminMixin
+
 # Utilities
-import csv
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+from cride.utils.exports import queryset_rows, streaming_csv_response
 
 
 @admin.register(Circle)
-class CircleAdmin(admin.ModelAdmin):
+class CircleAdmin(ExportJobAdminMixin, admin.ModelAdmin):
     """Circle admin."""
 
     list_display = (
@@ -33,7 +37,13 @@ class CircleAdmin(admin.ModelAdmin):
         'is_limited'
     )
 
-    actions = ['make_verified', 'make_unverified', 'download_todays_rides']
+    actions = [
+        'make_verified',
+        'make_unverified',
+        'download_todays_rides',
+        'export_month_rides_csv',
+        'export_month_rides_ndjson',
+    ]
 
     def make_verified(self, request, queryset):
         """Make circles verified."""
@@ -46,20 +56,22 @@ class CircleAdmin(admin.ModelAdmin):
     make_unverified.short_description = 'Make selected circles unverified'
 
     def download_todays_rides(self, request, queryset):
-        """Return today's rides."""
-        now = timezone.now()
-        start = datetime(now.year, now.month, now.day, 0, 0, 0)
-        end = start + timedelta(days=1)
+        """Return today's rides.
+        The day window is midnight to midnight in the current time
+        zone, the CSV is streamed in chunks of rows.
+        """
+        today = timezone.localdate()
+        start = timezone.make_aware(datetime.combine(today, time.min))
+        end = timezone.make_aware(datetime.combine(today + timedelta(days=1), time.min))
         rides = Ride.objects.filter(
             offered_in__in=queryset.values_list('id'),
             departure_date__gte=start,
-            departure_date__lte=end
+            departure_date__lt=end
+        ).annotate(
+            passengers_count=Count('passengers')
         ).order_by('departure_date')
 
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="rides.csv"'
-        writer = csv.writer(response)
-        writer.writerow([
+        header = [
             'id',
             'passengers',
             'departure_location',
@@ -67,17 +79,35 @@ class CircleAdmin(admin.ModelAdmin):
             'arrival_location',
             'arrival_date',
             'rating',
+        ]
+        rows = queryset_rows(rides, [
+            'pk',
+            'passengers_count',
+            'departure_location',
+            'departure_date',
+            'arrival_location',
+            'arrival_date',
+            'rating',
         ])
-        for ride in rides:
-            writer.writerow([
-                ride.pk,
-                ride.passengers.count(),
-                ride.departure_location,
-                str(ride.departure_date),
-                ride.arrival_location,
-                str(ride.arrival_date),
-                ride.rating,
-            ])
-
-        return response
+        return streaming_csv_response('rides.csv', header, rows)
     download_todays_rides.short_description = 'Download todays rides'
+
+    def export_month_rides(self, request, queryset, format):
+        """Enqueue the export of this month's rides."""
+        first_day = timezone.localdate().replace(day=1)
+        next_month = (first_day + timedelta(days=31)).replace(day=1)
+        self.enqueue_export(request, 'rides', {
+            'circles': self.get_export_selection(request, queryset),
+            'start': timezone.make_aware(datetime.combine(first_day, time.min)).isoformat(),
+            'end': timezone.make_aware(datetime.combine(next_month, time.min)).isoformat(),
+        }, format)
+
+    def export_month_rides_csv(self, request, queryset):
+        """Export this month's rides as CSV in background."""
+        self.export_month_rides(request, queryset, ExportJob.CSV)
+    export_month_rides_csv.short_description = 'Export this month rides (CSV)'
+
+    def export_month_rides_ndjson(self, request, queryset):
+        """Export this month's rides as NDJSON in background."""
+        self.export_month_rides(request, queryset, ExportJob.NDJSON)
+    export_month_rides_ndjson.short_description = 'Export this month rides (NDJSON)'
@@ -7,3 +7,7 @@ class CirclesAppConfig(AppConfig):
     """Users app config"""
     name = 'cride.circles'
     verbose_name = 'Circles'
+
+    def ready(self):
+        """Register signal handlers."""
+        import cride.circles.signals  # NOQA
@@ -0,0 +1,213 @@
+"""Circles cache."""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+
+# Models
+from cride.circles.models import Circle, Membership
+
+# Metrics
+from cride.utils.metrics import CIRCLE_RESOLVER_LOCAL_SIZE, CIRCLE_RESOLVER_LOOKUPS
+
+# Utilities
+import copy
+from cride.utils.cache import LocalLRUCache
+from cride.utils.routers import primary
+
+CIRCLE_KEY = 'circles:circle:slug:{}'
+MEMBERSHIP_KEY = 'circles:circle:{}:membership:{}'
+USER_CIRCLES_KEY = 'circles:user:{}:circles'
+
+# Cached value for users without an active membership.
+NO_MEMBERSHIP = 0
+
+
+def get_active_membership(user, circle, request=None):
+    """Return the user's active membership in the circle, None if there is none.
+    Lookups are memoized on the request, so permissions and serializers
+    handling the same request share one membership, and kept in the
+    shared cache for CIRCLES_MEMBERSHIP_CACHE_TIMEOUT seconds.
+    """
+    if user is None or not user.is_authenticated:
+        return None
+
+    memo = None
+    if request is not None:
+        memo = getattr(request, '_active_memberships', None)
+        if memo is None:
+            memo = request._active_memberships = {}
+        if (user.pk, circle.pk) in memo:
+            return memo[(user.pk, circle.pk)]
+
+    key = MEMBERSHIP_KEY.format(circle.pk, user.pk)
+    timeout = settings.CIRCLES_MEMBERSHIP_CACHE_TIMEOUT
+    membership = cache.get(key) if timeout else None
+    if membership is None:
+        with primary():
+            membership = Membership.objects.filter(
+                user=user,
+                circle=circle,
+                is_active=True
+            ).first()
+        if timeout:
+            cache.set(key, membership or NO_MEMBERSHIP, timeout)
+    elif membership == NO_MEMBERSHIP:
+        membership = None
+
+    if memo is not None:
+        memo[(user.pk, circle.pk)] = membership
+    return membership
+
+
+def invalidate_membership(circle_id, user_id):
+    """Drop the shared cache entry of a user's membership in a circle.
+    The entry is dropped again once the transaction commits, so
+    memberships cached by readers racing with the transaction are
+    discarded too.
+    """
+    key = MEMBERSHIP_KEY.format(circle_id, user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def get_user_circles(user):
+    """Return the slug names of the circles the user is an active member of.
+    The summary is kept in the shared cache for
+    CIRCLES_MEMBERSHIP_CACHE_TIMEOUT seconds, circles themselves are
+    resolved through the circle resolver so their data stays fresh.
+    """
+    key = USER_CIRCLES_KEY.format(user.pk)
+    timeout = settings.CIRCLES_MEMBERSHIP_CACHE_TIMEOUT
+    slug_names = cache.get(key) if timeout else None
+    if slug_names is None:
+        with primary():
+            slug_names = list(Membership.objects.filter(
+                user=user,
+                is_active=True
+            ).order_by('created').values_list('circle__slug_name', flat=True))
+        if timeout:
+            cache.set(key, slug_names, timeout)
+    return slug_names
+
+
+def invalidate_user_circles(*user_ids):
+    """Drop the cached circles summary of the users, now and once the transaction commits."""
+    keys = [USER_CIRCLES_KEY.format(user_id) for user_id in user_ids]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CircleResolver(object):
+    """Resolve circles by slug name.
+    Look circles up in a bounded per-worker LRU first, then in the
+    shared cache and finally in the database. Saving a circle drops it
+    from the shared cache and from this worker's LRU, other workers
+    see the change once their local entry expires.
+
+    Lookups are counted by the level that answered them, and the LRU
+    size is reported, in the `cride_circle_resolver_*` metrics.
+    """
+
+    def __init__(self):
+        self.local = None
+
+    def get_local(self):
+        """Return the worker's LRU, built on first use from settings."""
+        if self.local is None:
+            self.local = LocalLRUCache(
+                maxsize=settings.CIRCLES_RESOLVER_MAX_SIZE,
+                ttl=settings.CIRCLES_RESOLVER_TTL
+            )
+        return self.local
+
+    def get(self, slug_name):
+        """Return the circle with the slug name, None if it doesn't exist."""
+        local = self.get_local()
+        circle = local.get(slug_name)
+        if circle is not None:
+            CIRCLE_RESOLVER_LOOKUPS.labels('local').inc()
+        else:
+            key = CIRCLE_KEY.format(slug_name)
+            circle = cache.get(key)
+            if circle is not None:
+                CIRCLE_RESOLVER_LOOKUPS.labels('shared').inc()
+            else:
+                CIRCLE_RESOLVER_LOOKUPS.labels('database').inc()
+                with primary():
+                    circle = Circle.objects.filter(slug_name=slug_name).first()
+                if circle is None:
+                    return None
+                cache.set(key, circle, settings.CIRCLES_CACHE_TIMEOUT)
+            local.set(slug_name, circle)
+            CIRCLE_RESOLVER_LOCAL_SIZE.set(len(local))
+        # Callers may modify the instance, never hand out the cached one.
+        return copy.copy(circle)
+
+    def get_many(self, slug_names):
+        """Return the existing circles with the slug names, in the same order.
+        Circles missing from the LRU are fetched from the shared cache
+        with one call and the remaining ones with one query.
+        """
+        local = self.get_local()
+        circles = {}
+        for slug_name in slug_names:
+            circle = local.get(slug_name)
+            if circle is not None:
+                circles[slug_name] = circle
+        if circles:
+            CIRCLE_RESOLVER_LOOKUPS.labels('local').inc(len(circles))
+
+        missing = [slug_name for slug_name in slug_names if slug_name not in circles]
+        if missing:
+            keys = {CIRCLE_KEY.format(slug_name): slug_name for slug_name in missing}
+            shared = cache.get_many(list(keys))
+            if shared:
+                CIRCLE_RESOLVER_LOOKUPS.labels('shared').inc(len(shared))
+            for key, circle in shared.items():
+                circles[keys[key]] = circle
+                local.set(keys[key], circle)
+            missing = [slug_name for slug_name in missing if slug_name not in circles]
+        if missing:
+            CIRCLE_RESOLVER_LOOKUPS.labels('database').inc(len(missing))
+            with primary():
+                fetched = {circle.slug_name: circle for circle in Circle.objects.filter(slug_name__in=missing)}
+            cache.set_many(
+                {CIRCLE_KEY.format(slug_name): circle for slug_name, circle in fetched.items()},
+                settings.CIRCLES_CACHE_TIMEOUT
+            )
+            for slug_name, circle in fetched.items():
+                circles[slug_name] = circle
+                local.set(slug_name, circle)
+        CIRCLE_RESOLVER_LOCAL_SIZE.set(len(local))
+        return [copy.copy(circles[slug_name]) for slug_name in slug_names if slug_name in circles]
+
+    def invalidate(self, slug_name):
+        """Drop the circle from the shared cache and this worker's LRU.
+        The entry is dropped again once the transaction commits, so
+        circles cached by readers racing with the transaction are
+        discarded too.
+        """
+        self.evict(slug_name)
+        transaction.on_commit(lambda: self.evict(slug_name))
+
+    def evict(self, slug_name):
+        """Drop the circle from the shared cache and this worker's LRU now."""
+        cache.delete(CIRCLE_KEY.format(slug_name))
+        local = self.get_local()
+        local.delete(slug_name)
+        CIRCLE_RESOLVER_LOCAL_SIZE.set(len(local))
+
+
+circle_resolver = CircleResolver()
+
+
+def get_circle_or_404(slug_name):
+    """Return the circle with the slug name or raise Http404."""
+    circle = circle_resolver.get(slug_name)
+    if circle is None:
+        raise Http404('No Circle matches the given query.')
+    return circle
@@ -0,0 +1,334 @@
+"""Bulk import command."""
+
+# Django
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Cache
+from cride.circles.cache import MEMBERSHIP_KEY, circle_resolver, invalidate_user_circles
+from cride.rides.cache import invalidate_rides
+
+# Utilities
+import csv
+from collections import Counter
+from cride.utils.stats import StatsUpdate
+import json
+import os
+import time
+
+
+class Command(BaseCommand):
+    """Import circles, users, memberships and rides in bulk.
+    Records are read in Django fixture shape (`model`, `pk`, `fields`),
+    or as flat objects and CSV rows of the `--model` given. JSON files
+    are loaded at once, NDJSON and CSV files are streamed.
+
+    Rows are validated and inserted with bulk_create, one transaction
+    per batch. Foreign keys are given as natural keys (circle slug
+    name, user username) or as the `pk` of a record imported earlier,
+    and resolved from maps preloaded from the database. Rows whose
+    natural key already exists are skipped, so imports can be resumed.
+    """
+
+    help = 'Bulk import circles, users, memberships and rides from JSON, NDJSON or CSV files.'
+
+    MODELS = {
+        'circles.circle': Circle,
+        'users.user': User,
+        'circles.membership': Membership,
+        'rides.ride': Ride,
+    }
+
+    # Natural key field of the models other rows reference
+    KEYS = {
+        'circles.circle': 'slug_name',
+        'users.user': 'username',
+    }
+
+    LOOKUP_SIZE = 500
+
+    # Fields computed by the importer, ignored in the input
+    DERIVED = {
+        Membership: ('profile',),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+')
+        parser.add_argument('--format', choices=['json', 'ndjson', 'csv'], help='Defaults to the file extension.')
+        parser.add_argument(
+            '--model',
+            choices=sorted(self.MODELS),
+            help='Model of records without one, required for CSV.'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--fail-fast', action='store_true', help='Stop at the first invalid row.')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.fail_fast = options['fail_fast']
+        self.keys = {
+            label: dict(self.MODELS[label].objects.values_list(field, 'pk'))
+            for label, field in self.KEYS.items()
+        }
+        self.emails = set(User.objects.values_list('email', flat=True))
+        # Generating a random unusable password per user dominates the row cost
+        self.unusable_password = make_password(None)
+        self.input_pks = {label: {} for label in self.KEYS}
+        self.memberships = None
+        self.stats = {label: {'created': 0, 'skipped': 0, 'invalid': 0, 'seconds': 0.0} for label in self.MODELS}
+
+        start = time.perf_counter()
+        for path in options['files']:
+            file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+            if file_format not in ('json', 'ndjson', 'csv'):
+                raise CommandError('Unknown format of {}, use --format.'.format(path))
+            if file_format == 'csv' and not options['model']:
+                raise CommandError('CSV files require --model.')
+            with open(path, newline='', encoding='utf-8') as input_file:
+                self.load(path, self.read(input_file, file_format, options['model']))
+        elapsed = time.perf_counter() - start
+
+        total = 0
+        for label, stats in self.stats.items():
+            if stats['created'] or stats['skipped'] or stats['invalid']:
+                total += stats['created']
+                self.stdout.write(
+                    '{:<20} {created:>9} created {skipped:>7} skipped {invalid:>7} invalid '
+                    '{rate:>10.0f} rows/s'.format(
+                        label, rate=stats['created'] / stats['seconds'] if stats['seconds'] else 0, **stats
+                    )
+                )
+        self.stdout.write('Imported {} rows in {:.1f}s, {:.0f} rows/s.'.format(
+            total, elapsed, total / elapsed if elapsed else 0
+        ))
+
+    def read(self, input_file, file_format, default_model):
+        """Yield the line, model label, input pk and fields of every record."""
+        if file_format == 'csv':
+            for line, row in enumerate(csv.DictReader(input_file), 2):
+                pk = row.pop('pk', None)
+                yield line, default_model, pk, row
+            return
+
+        if file_format == 'json':
+            records = enumerate(json.load(input_file), 1)
+        else:
+            records = ((line, json.loads(text)) for line, text in enumerate(input_file, 1) if text.strip())
+        for line, record in records:
+            label = record.pop('model', default_model)
+            pk = record.pop('pk', None)
+            yield line, label, pk, record.pop('fields', record)
+
+    def load(self, path, records):
+        """Import records in batches of consecutive rows of the same model."""
+        batch, batch_label = [], None
+        for line, label, pk, fields in records:
+            if label not in self.MODELS:
+                self.invalid(path, line, label, 'Unsupported model "{}".'.format(label))
+                continue
+            if batch and (label != batch_label or len(batch) >= self.batch_size):
+                self.flush(path, batch_label, batch)
+                batch = []
+            batch_label = label
+            batch.append((line, pk, fields))
+        if batch:
+            self.flush(path, batch_label, batch)
+
+    def flush(self, path, label, batch):
+        """Validate and insert a batch of rows."""
+        start = time.perf_counter()
+        model = self.MODELS[label]
+        stats = self.stats[label]
+        key_field = self.KEYS.get(label)
+        rows, seen = [], set()
+        for line, pk, fields in batch:
+            try:
+                instance, related = self.build(model, fields)
+            except (ValidationError, ValueError, TypeError) as error:
+                self.invalid(path, line, label, error)
+                continue
+
+            key = getattr(instance, key_field) if key_field else None
+            if key_field and not key:
+                self.invalid(path, line, label, 'Field "{}" is required.'.format(key_field))
+                continue
+            if key_field:
+                if pk not in (None, ''):
+                    self.input_pks[label][str(pk)] = key
+                if key in self.keys[label] or key in seen:
+                    stats['skipped'] += 1
+                    continue
+                seen.add(key)
+            if self.is_duplicate(instance):
+                stats['skipped'] += 1
+                continue
+            rows.append((instance, related))
+
+        with transaction.atomic():
+            instances = [instance for instance, _ in rows]
+            getattr(self, 'insert_{}'.format(model._meta.model_name))(rows, instances)
+        stats['created'] += len(rows)
+        stats['seconds'] += time.perf_counter() - start
+
+    def build(self, model, fields):
+        """Return an unsaved instance of the row and its many to many values.
+        Only the given fields are validated, missing ones keep their
+        default unless the database could not store the row without them.
+        """
+        for field in model._meta.fields:
+            if field.name in fields or field.name in self.DERIVED.get(model, ()):
+                continue
+            if field.blank or field.null or field.has_default():
+                continue
+            if field.is_relation or not field.empty_strings_allowed:
+                raise ValidationError('Field "{}" is required.'.format(field.name))
+
+        instance, related = model(), {}
+        exclude = set(field.name for field in model._meta.fields)
+        for name, value in fields.items():
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                raise ValidationError('Unknown field "{}".'.format(name))
+            if field.name in self.DERIVED.get(model, ()):
+                continue
+            if field.many_to_many:
+                label = field.related_model._meta.label_lower
+                related[name] = [self.resolve(label, item) for item in value or []]
+            elif field.is_relation:
+                if value in ('', None):
+                    setattr(instance, field.attname, None)
+                else:
+                    setattr(instance, field.attname, self.resolve(field.related_model._meta.label_lower, value))
+            else:
+                setattr(instance, field.attname, None if value == '' and field.null else value)
+                exclude.discard(field.name)
+
+        if model is User and 'password' not in fields:
+            instance.password = self.unusable_password
+        instance.clean_fields(exclude=exclude)
+        return instance, related
+
+    def resolve(self, label, value):
+        """Return the database pk of a natural key or imported record pk."""
+        keys = self.keys.get(label)
+        if keys is None:
+            raise ValidationError('Relations to {} are not supported.'.format(label))
+        if value in keys:
+            return keys[value]
+        key = self.input_pks[label].get(str(value))
+        if key in keys:
+            return keys[key]
+        raise ValidationError('Unknown {} "{}".'.format(label, value))
+
+    def is_duplicate(self, instance):
+        """Return whether the row exists under another unique field."""
+        if isinstance(instance, User):
+            if instance.email in self.emails:
+                return True
+            self.emails.add(instance.email)
+        elif isinstance(instance, Membership):
+            if self.memberships is None:
+                self.memberships = set(Membership.objects.values_list('user_id', 'circle_id'))
+            pair = (instance.user_id, instance.circle_id)
+            if pair in self.memberships:
+                return True
+            self.memberships.add(pair)
+        return False
+
+    def lookup(self, queryset, field, values, *fields):
+        """Return the values_list of fields of the rows with field in values.
+        Values are looked up in chunks, SQLite limits a query to 999 params.
+        """
+        values, rows = list(values), []
+        for start in range(0, len(values), self.LOOKUP_SIZE):
+            rows += queryset.filter(
+                **{field + '__in': values[start:start + self.LOOKUP_SIZE]}
+            ).values_list(*fields)
+        return rows
+
+    def update_keys(self, label, instances):
+        """Add the pks of the inserted instances to the natural key map."""
+        field = self.KEYS[label]
+        keys = [getattr(instance, field) for instance in instances]
+        self.keys[label].update(self.lookup(self.MODELS[label].objects, field, keys, field, 'pk'))
+
+    def insert_circle(self, rows, instances):
+        """Insert circles."""
+        Circle.objects.bulk_create(instances)
+        self.update_keys('circles.circle', instances)
+
+    def insert_user(self, rows, instances):
+        """Insert users and their profiles."""
+        User.objects.bulk_create(instances)
+        self.update_keys('users.user', instances)
+        user_ids = self.keys['users.user']
+        Profile.objects.bulk_create([Profile(user_id=user_ids[instance.username]) for instance in instances])
+
+    def insert_membership(self, rows, instances):
+        """Insert memberships along with their user profile."""
+        user_ids = set(instance.user_id for instance in instances)
+        profiles = dict(self.lookup(Profile.objects, 'user_id', user_ids, 'user_id', 'pk'))
+        for instance in instances:
+            instance.profile_id = profiles[instance.user_id]
+        Membership.objects.bulk_create(instances)
+        cache.delete_many([MEMBERSHIP_KEY.format(instance.circle_id, instance.user_id) for instance in instances])
+        invalidate_user_circles(*set(instance.user_id for instance in instances))
+
+        # Circle active member counts
+        counts = Counter(instance.circle_id for instance in instances if instance.is_active)
+        stats = StatsUpdate()
+        for circle_id, count in counts.items():
+            stats.add(Circle.objects.filter(pk=circle_id), active_member_count=count)
+        stats.apply()
+        for slug_name, in self.lookup(Circle.objects, 'pk', set(counts), 'slug_name'):
+            circle_resolver.invalidate(slug_name)
+
+    def insert_ride(self, rows, instances):
+        """Insert rides and their passengers."""
+        for instance in instances:
+            instance.search_text = instance.build_search_text()
+            instance.departure_geohash = instance.build_departure_geohash()
+
+        returns_ids = connection.features.can_return_ids_from_bulk_insert
+        with_passengers = [(instance, related) for instance, related in rows if related.get('passengers')]
+        if returns_ids:
+            Ride.objects.bulk_create(instances)
+        else:
+            # Without the inserted ids, rides with passengers are saved one by one
+            Ride.objects.bulk_create([instance for instance, related in rows if not related.get('passengers')])
+            for instance, _ in with_passengers:
+                instance.save()
+
+        Passenger = Ride.passengers.through
+        Passenger.objects.bulk_create([
+            Passenger(ride_id=instance.pk, user_id=user_id)
+            for instance, related in with_passengers
+            for user_id in related['passengers']
+        ])
+
+        for circle_id in set(instance.offered_in_id for instance in instances):
+            invalidate_rides(circle_id)
+
+    def invalid(self, path, line, label, error):
+        """Report an invalid row."""
+        if label in self.stats:
+            self.stats[label]['invalid'] += 1
+        if isinstance(error, ValidationError) and hasattr(error, 'error_dict'):
+            error = '; '.join(
+                '{}: {}'.format(name, ' '.join(messages)) for name, messages in error.message_dict.items()
+            )
+        elif isinstance(error, ValidationError):
+            error = ' '.join(error.messages)
+        message = '{}:{}: {}'.format(path, line, error)
+        if self.fail_fast:
+            raise CommandError(message)
+        self.stderr.write(message)
@@ -1 +1,2 @@
 from .invitations import *
+from .circles import *
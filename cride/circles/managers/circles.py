@@ -0,0 +1,26 @@
+"""Circle managers."""
+
+# Django
+from django.db import models
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+class CircleManager(models.Manager):
+    """Circle manager.
+    Used to keep the active member count within the members limit.
+    """
+
+    def reserve_member(self, circle_id):
+        """Count a new active member if the circle has room for it.
+        The limit is checked and the count incremented in a single
+        conditional UPDATE, so concurrent joins can't overshoot it.
+        Return whether the member fit.
+        """
+        return bool(self.filter(
+            Q(is_limited=False) | Q(active_member_count__lt=F('members_limit')),
+            pk=circle_id
+        ).update(
+            active_member_count=F('active_member_count') + 1,
+            modified=timezone.now()
+        ))
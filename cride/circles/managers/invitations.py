@@ -1,10 +1,10 @@
 """Circle invitation managers."""
 
 # Django
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
 # Utilities
-import random
+import secrets
 from string import ascii_uppercase, digits
 
 
@@ -14,12 +14,45 @@ class InvitationManager(models.Manager):
     """
 
     CODE_LENGTH = 10
+    CODE_POOL = ascii_uppercase + digits + '.-'
+    MAX_ATTEMPTS = 5
+
+    def generate_code(self):
+        """Return a random code from a cryptographically secure source."""
+        return ''.join(secrets.choice(self.CODE_POOL) for _ in range(self.CODE_LENGTH))
 
     def create(self, **kwargs):
         """Handle code creation."""
-        pool = ascii_uppercase + digits + '.-'
-        code = kwargs.get('code', ''.join(random.choices(pool, k=self.CODE_LENGTH)))
+        code = kwargs.get('code', self.generate_code())
         while self.filter(code=code).exists():
-            code = ''.join(random.choices(pool, k=self.CODE_LENGTH))
+            code = self.generate_code()
         kwargs['code'] = code
         return super(InvitationManager, self).create(**kwargs)
+
+    def create_bulk(self, count, **kwargs):
+        """Create count invitations sharing kwargs with a single insert.
+        Codes already taken are looked up with one query and only
+        those are regenerated. If a concurrent insert still hits the
+        unique index the batch is retried with fresh codes.
+        """
+        if count <= 0:
+            return []
+
+        codes = set()
+        for attempt in range(self.MAX_ATTEMPTS):
+            while len(codes) < count:
+                codes.add(self.generate_code())
+            codes.difference_update(self.filter(code__in=codes).values_list('code', flat=True))
+            if len(codes) < count:
+                continue
+
+            invitations = [self.model(code=code, **kwargs) for code in codes]
+            try:
+                with transaction.atomic():
+                    return self.bulk_create(invitations)
+            except IntegrityError:
+                if attempt == self.MAX_ATTEMPTS - 1:
+                    raise
+                codes.clear()
+
+        raise IntegrityError('Could not generate {} unique invitation codes.'.format(count))
@@ -0,0 +1,30 @@
+# Generated by Django 2.0.10 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+def count_active_members(apps, schema_editor):
+    """Populate the active member count of existing circles."""
+    Circle = apps.get_model('circles', 'Circle')
+    Membership = apps.get_model('circles', 'Membership')
+    counts = Membership.objects.filter(
+        is_active=True
+    ).order_by().values('circle_id').annotate(total=models.Count('id'))
+    for row in counts:
+        Circle.objects.filter(pk=row['circle_id']).update(active_member_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0006_auto_20210511_0616'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='circle',
+            name='active_member_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of active memberships, kept up to date on joins and leaves.'),
+        ),
+        migrations.RunPython(count_active_members, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,9 @@ from django.db import models
 # Utilities
 from cride.utils.models import CRideModel
 
+# Managers
+from cride.circles.managers import CircleManager
+
 class Circle(CRideModel):
     """Circle model.
     A circle is a private group where rides are offered and taken
@@ -26,6 +29,11 @@ class Circle(CRideModel):
 
     rides_taken = models.PositiveIntegerField(default=0)
 
+    active_member_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of active memberships, kept up to date on joins and leaves.'
+    )
+
     verified = models.BooleanField(
         'verified circle',
         default=False,
@@ -48,6 +56,9 @@ class Circle(CRideModel):
         help_text='If circle is limited, the will be the limit on the number of members.'
     )
 
+    # Manager
+    objects = CircleManager()
+
     def __str__(self):
         """Return circle name."""
         return self.name
@@ -1,8 +1,8 @@
 """Circle permission classes"""
 # Django Rest Framework
 from rest_framework.permissions import BasePermission
-# Models
-from cride.circles.models import Membership
+# Cache
+from cride.circles.cache import get_active_membership
 
 
 class IsCircleAdmin(BasePermission):
@@ -10,13 +10,5 @@ class IsCircleAdmin(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         """Verify user have a membership in the object"""
-        try:
-            Membership.objects.get(
-                user=request.user,
-                circle=obj,
-                is_admin=True,
-                is_active=True
-            )
-        except Membership.DoesNotExist:
-            return False
-        return True
+        membership = get_active_membership(request.user, obj, request)
+        return membership is not None and membership.is_admin
@@ -1,7 +1,7 @@
 """Circle memberships permission"""
 from rest_framework.permissions import BasePermission
 
-from cride.circles.models import Membership
+from cride.circles.cache import get_active_membership
 
 
 class IsActiveCircleMember(BasePermission):
@@ -12,15 +12,7 @@ class IsActiveCircleMember(BasePermission):
 
     def has_permission(self, request, view):
         """Verify user is an active member of the circle"""
-        try:
-            Membership.objects.get(
-                user=request.user,
-                circle=view.circle,
-                is_active=True
-            )
-        except Membership.DoesNotExist:
-            return False
-        return True
+        return get_active_membership(request.user, view.circle, request) is not None
 
 class IsSelfMember(BasePermission):
     """
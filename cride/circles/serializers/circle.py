@@ -33,14 +33,16 @@ class CircleModelSerializer(serializers.ModelSerializer):
             'verified',
             'is_public',
             'is_limited',
-            'members_limit'
+            'members_limit',
+            'active_member_count'
         )
         read_only_fields = (
             'id',
             'is_public',
-            'verified'
+            'verified',
             'rides_offered',
-            'rides_taken'
+            'rides_taken',
+            'active_member_count'
         )
 
     def validate(self, data):
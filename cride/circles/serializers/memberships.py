@@ -1,13 +1,18 @@
 """memberships serializer"""
 
 # Django rest framework
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 # Serializer
 from cride.users.serializers import UserModelSerializer
 # Models
-from cride.circles.models import Membership
+from cride.circles.models import Circle, Membership
 from cride.circles.models.invitations import Invitation
+# Cache
+from cride.circles.cache import circle_resolver
+# Utilities
+from cride.utils.stats import StatsUpdate
 
 class MembershipModelSerializer(serializers.ModelSerializer):
     """Member model serializer"""
@@ -68,10 +73,13 @@ class AddMemberSerializer(serializers.Serializer):
         return data
 
     def validate(self, data):
-        """Verify circle is capable of accepting a new member."""
+        """Verify circle is capable of accepting a new member.
+        Only a quick check against the known member count, the limit
+        is enforced when the member is actually added.
+        """
         circle = self.context['circle']
-        if circle.is_limited and circle.members.count() >= circle.members_limit:
-            raise serializers.ValidationError('Circle has reached its member limit ')
+        if circle.is_limited and circle.active_member_count >= circle.members_limit:
+            raise serializers.ValidationError('Circle has reached its member limit')
         return data
 
     def create(self, data):
@@ -82,13 +90,23 @@ class AddMemberSerializer(serializers.Serializer):
 
         now = timezone.now()
 
-        # Member creation
-        member = Membership.objects.create(
-            user=user,
-            profile=user.profile,
-            circle=circle,
-            invited_by=invitation.issued_by
-        )
+        # Member creation, the issuer's invitations are counted and the seat
+        # in the circle is taken in the same transaction
+        with transaction.atomic():
+            StatsUpdate().add(
+                Membership.objects.filter(user_id=invitation.issued_by_id, circle=circle),
+                used_invitations=1,
+                remaining_invitations=-1
+            ).apply()
+            if not Circle.objects.reserve_member(circle.pk):
+                raise serializers.ValidationError('Circle has reached its member limit')
+            member = Membership.objects.create(
+                user=user,
+                profile=user.profile,
+                circle=circle,
+                invited_by=invitation.issued_by
+            )
+        circle_resolver.invalidate(circle.slug_name)
 
         # Update Invitation
         invitation.used_by = user
@@ -96,10 +114,4 @@ class AddMemberSerializer(serializers.Serializer):
         invitation.used_at = now
         invitation.save()
 
-        # Update issuer data
-        issuer = Membership.objects.get(user=invitation.issued_by, circle=circle)
-        issuer.used_invitations += 1
-        issuer.remaining_invitations -= 1
-        issuer.save()
-
         return member
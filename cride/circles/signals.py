@@ -0,0 +1,40 @@
+"""Circles signals."""
+
+# Django
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+# Models
+from cride.circles.models import Circle, Membership
+
+# Cache
+from cride.circles.cache import circle_resolver, invalidate_membership, invalidate_user_circles
+
+
+@receiver(pre_save, sender=Circle)
+def circle_renaming(sender, instance, **kwargs):
+    """Invalidate the previous slug name of a circle being renamed."""
+    if instance.pk is None:
+        return
+    previous = Circle.objects.filter(pk=instance.pk).values_list('slug_name', flat=True).first()
+    if previous is not None and previous != instance.slug_name:
+        circle_resolver.invalidate(previous)
+        invalidate_user_circles(*Membership.objects.filter(
+            circle=instance,
+            is_active=True
+        ).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=Circle)
+@receiver(post_delete, sender=Circle)
+def circle_changed(sender, instance, **kwargs):
+    """Invalidate the cached circle."""
+    circle_resolver.invalidate(instance.slug_name)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def membership_changed(sender, instance, **kwargs):
+    """Invalidate the cached membership lookup and the user's circles."""
+    invalidate_membership(instance.circle_id, instance.user_id)
+    invalidate_user_circles(instance.user_id)
@@ -0,0 +1 @@
+"""Circles tests."""
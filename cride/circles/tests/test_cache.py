@@ -0,0 +1,122 @@
+"""Circles cache tests."""
+
+# Django
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+
+# Models
+from cride.circles.models import Membership
+
+# Cache
+from cride.circles.cache import MEMBERSHIP_KEY, circle_resolver, get_active_membership
+
+# Utilities
+from datetime import timedelta
+from django.utils import timezone
+from django.core.cache import cache
+from prometheus_client import REGISTRY
+from cride.utils.testing import clear_caches, get_client
+from cride.utils.factories import MembershipFactory, RideFactory
+
+
+class CircleResolverTestCase(TestCase):
+    """Circle resolution through the local LRU and the shared cache."""
+
+    def setUp(self):
+        clear_caches()
+        membership = MembershipFactory()
+        self.circle = membership.circle
+        self.client = get_client(membership.user)
+
+    def get_lookups(self, source):
+        """Return the lookups counted for a source."""
+        return REGISTRY.get_sample_value('cride_circle_resolver_lookups_total', {'source': source}) or 0
+
+    def test_lookup_metrics(self):
+        """Lookups are counted by the level that answered them."""
+        before = {source: self.get_lookups(source) for source in ('local', 'shared', 'database')}
+        circle_resolver.get(self.circle.slug_name)
+        circle_resolver.get(self.circle.slug_name)
+        circle_resolver.get_local().clear()
+        circle_resolver.get(self.circle.slug_name)
+        self.assertEqual(self.get_lookups('database') - before['database'], 1)
+        self.assertEqual(self.get_lookups('local') - before['local'], 1)
+        self.assertEqual(self.get_lookups('shared') - before['shared'], 1)
+        self.assertEqual(REGISTRY.get_sample_value('cride_circle_resolver_local_size'), 1)
+
+    def test_stats_are_fresh(self):
+        """Retrieved circles, and their ETags, reflect the stats updated by rides."""
+        url = '/circles/{}/'.format(self.circle.slug_name)
+        response = self.client.get(url)
+        self.assertEqual(response.data['rides_offered'], 0)
+        etag = response['ETag']
+
+        departure = timezone.now() + timedelta(hours=1)
+        response = self.client.post('/circles/{}/rides/'.format(self.circle.slug_name), {
+            'available_seats': 3,
+            'departure_location': 'Ciudad Universitaria',
+            'departure_date': departure.isoformat(),
+            'arrival_location': 'Polanco',
+            'arrival_date': (departure + timedelta(hours=1)).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['rides_offered'], 1)
+
+        ride = RideFactory(offered_in=self.circle)
+        passenger = MembershipFactory(circle=self.circle).user
+        response = get_client(passenger).post('/circles/{}/rides/{}/join/'.format(self.circle.slug_name, ride.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url).data['rides_taken'], 1)
+
+
+class MembershipCacheTestCase(TestCase):
+    """Access granted by cached memberships."""
+
+    def setUp(self):
+        clear_caches()
+        membership = MembershipFactory(is_admin=True)
+        self.circle = membership.circle
+        self.membership = membership
+        self.client = get_client(membership.user)
+
+    def test_deactivated_member(self):
+        """Members leaving the circle lose access right away."""
+        url = '/circles/{}/rides/'.format(self.circle.slug_name)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        response = self.client.delete('/circles/{}/members/{}/'.format(
+            self.circle.slug_name,
+            self.membership.user.username
+        ))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_demoted_admin(self):
+        """Admins demoted lose their admin access right away."""
+        url = '/circles/{}/'.format(self.circle.slug_name)
+        self.assertEqual(self.client.patch(url, {'about': 'Car pool'}).status_code, 200)
+
+        self.membership.is_admin = False
+        self.membership.save()
+        self.assertEqual(self.client.patch(url, {'about': 'Closed'}).status_code, 403)
+
+
+class MembershipInvalidationTestCase(TransactionTestCase):
+    """Cached memberships dropped on commit."""
+
+    def setUp(self):
+        clear_caches()
+        self.membership = MembershipFactory()
+
+    def test_racing_reader(self):
+        """Memberships cached before the change commits are dropped too."""
+        user, circle = self.membership.user, self.membership.circle
+        stale = Membership.objects.get(pk=self.membership.pk)
+        with transaction.atomic():
+            self.membership.is_active = False
+            self.membership.save()
+            # A reader outside the transaction still sees the active membership.
+            cache.set(MEMBERSHIP_KEY.format(circle.pk, user.pk), stale)
+        self.assertIsNone(get_active_membership(user, circle))
@@ -0,0 +1,92 @@
+"""Membership tests."""
+
+# Django
+from django.test import TestCase
+
+# Django REST Framework
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.circles.models.invitations import Invitation
+
+# Serializers
+from cride.circles.serializers import AddMemberSerializer
+
+# Utilities
+from cride.utils.testing import clear_caches, get_client
+from cride.utils.factories import CircleFactory, InvitationFactory, MembershipFactory, UserFactory
+
+
+class MembershipFactoryTestCase(TestCase):
+    """Circle stats of factory built memberships."""
+
+    def test_active_member_count(self):
+        """Only active memberships are counted."""
+        circle = CircleFactory()
+        MembershipFactory(circle=circle)
+        MembershipFactory(circle=circle)
+        MembershipFactory(circle=circle, is_active=False)
+        self.assertEqual(circle.active_member_count, 2)
+        self.assertEqual(Circle.objects.get(pk=circle.pk).active_member_count, 2)
+
+
+class MembersLimitTestCase(TestCase):
+    """Active member count of limited circles."""
+
+    def setUp(self):
+        clear_caches()
+        self.circle = CircleFactory(is_limited=True, members_limit=2)
+        self.issuer = MembershipFactory(circle=self.circle)
+
+    def get_count(self):
+        return Circle.objects.get(pk=self.circle.pk).active_member_count
+
+    def test_reserve_member(self):
+        """Members are counted until the circle is full."""
+        self.assertTrue(Circle.objects.reserve_member(self.circle.pk))
+        self.assertEqual(self.get_count(), 2)
+        self.assertFalse(Circle.objects.reserve_member(self.circle.pk))
+        self.assertEqual(self.get_count(), 2)
+
+    def test_unlimited(self):
+        """Circles without limit always have room."""
+        Circle.objects.filter(pk=self.circle.pk).update(is_limited=False, members_limit=0)
+        self.assertTrue(Circle.objects.reserve_member(self.circle.pk))
+        self.assertEqual(self.get_count(), 2)
+
+    def test_leave(self):
+        """Leaving members are discounted once."""
+        member = MembershipFactory(circle=self.circle)
+        client = get_client(self.issuer.user)
+        url = '/circles/{}/members/{}/'.format(self.circle.slug_name, member.user.username)
+        self.assertEqual(self.get_count(), 2)
+        self.assertEqual(client.delete(url).status_code, 204)
+        self.assertEqual(self.get_count(), 1)
+        self.assertEqual(client.delete(url).status_code, 404)
+        self.assertEqual(self.get_count(), 1)
+        self.assertFalse(Membership.objects.get(pk=member.pk).is_active)
+
+    def test_full_circle_rollback(self):
+        """Members that don't fit leave the invitation and stats untouched."""
+        invitation = InvitationFactory(circle=self.circle, issued_by=self.issuer.user)
+        # The circle seen by the request still has room, a concurrent join filled it.
+        MembershipFactory(circle=Circle.objects.get(pk=self.circle.pk))
+        user = UserFactory()
+        request = APIRequestFactory().post('/')
+        request.user = user
+        serializer = AddMemberSerializer(
+            data={'invitation_code': invitation.code},
+            context={'circle': self.circle, 'request': request}
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaises(serializers.ValidationError):
+            serializer.save()
+
+        self.assertEqual(self.get_count(), 2)
+        self.assertFalse(Membership.objects.filter(user=user).exists())
+        self.assertFalse(Invitation.objects.get(pk=invitation.pk).used)
+        issuer = Membership.objects.get(pk=self.issuer.pk)
+        self.assertEqual(issuer.used_invitations, self.issuer.used_invitations)
+        self.assertEqual(issuer.remaining_invitations, self.issuer.remaining_invitations)
@@ -14,7 +14,15 @@ from cride.circles.models import Circle, Membership
 # Filters
 from rest_framework.filters import SearchFilter, OrderingFilter
 
-class CircleViewSet(mixins.CreateModelMixin,
+# Cache
+from cride.circles.cache import circle_resolver, get_circle_or_404
+
+# Utilities
+from cride.utils.mixins import ConditionalGetMixin
+from cride.utils.stats import StatsUpdate
+
+class CircleViewSet(ConditionalGetMixin,
+                    mixins.CreateModelMixin,
                     mixins.RetrieveModelMixin,
                     mixins.UpdateModelMixin,
                     mixins.ListModelMixin,
@@ -28,6 +36,9 @@ class CircleViewSet(mixins.CreateModelMixin,
     filter_backends = (SearchFilter, OrderingFilter)
     search_fields = ('slug_name','name')
 
+    # Conditional GET
+    etag_actions = ('list', 'retrieve')
+
 
     def get_queryset(self):
         """Restrict list to public-only"""
@@ -36,6 +47,23 @@ class CircleViewSet(mixins.CreateModelMixin,
             return queryset.filter(is_public=True)
         return queryset
 
+    def get_object(self):
+        """Resolve retrieved circles through the circle cache.
+        Updates keep reading from the database so the saved row
+        always starts from fresh stats.
+        """
+        if self.action != 'retrieve':
+            return super(CircleViewSet, self).get_object()
+        circle = get_circle_or_404(self.kwargs[self.lookup_field])
+        self.check_object_permissions(self.request, circle)
+        return circle
+
+    def get_etag_validator(self):
+        """Validate retrieved circles with the cached circle."""
+        if self.action == 'retrieve':
+            return self.get_object().modified
+        return super(CircleViewSet, self).get_etag_validator()
+
     def get_permissions(self):
         """Assign permissions based on actions"""
         permissions = [IsAuthenticated]
@@ -56,3 +84,5 @@ class CircleViewSet(mixins.CreateModelMixin,
             is_admin=True,
             remaining_invitations=10
         )
+        StatsUpdate().add(circle, active_member_count=1).apply()
+        circle_resolver.invalidate(circle.slug_name)
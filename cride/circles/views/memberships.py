@@ -1,5 +1,8 @@
 """Circle memberships views"""
 
+# Django
+from django.db import transaction
+
 # Django rest Framework
 from rest_framework import mixins, viewsets, status
 from rest_framework.response import Response
@@ -13,9 +16,15 @@ from cride.circles.serializers import MembershipModelSerializer, AddMemberSerial
 # Permissions
 from rest_framework.permissions import IsAuthenticated
 from cride.circles.permissions.memberships import IsActiveCircleMember, IsSelfMember
+# Cache
+from cride.circles.cache import circle_resolver, get_circle_or_404
+# Utilities
+from cride.utils.mixins import ConditionalGetMixin
+from cride.utils.stats import StatsUpdate
 
 
-class MembershipViewSet(mixins.ListModelMixin,
+class MembershipViewSet(ConditionalGetMixin,
+                        mixins.ListModelMixin,
                         mixins.CreateModelMixin,
                         mixins.RetrieveModelMixin,
                         mixins.DestroyModelMixin,
@@ -24,10 +33,13 @@ class MembershipViewSet(mixins.ListModelMixin,
 
     serializer_class = MembershipModelSerializer
 
+    # Conditional GET, members are listed along with their user and profile
+    etag_fields = ('modified', 'user__modified', 'user__profile__modified')
+
     def dispatch(self, request, *args, **kwargs):
         """Verify that the circle exists."""
         slug_name = kwargs['slug_name']
-        self.circle = get_object_or_404(Circle, slug_name=slug_name)
+        self.circle = get_circle_or_404(slug_name)
         return super(MembershipViewSet, self).dispatch(request, *args, **kwargs)
 
     def get_permissions(self):
@@ -56,9 +68,21 @@ class MembershipViewSet(mixins.ListModelMixin,
         )
 
     def perform_destroy(self, instance):
-        """Disable membership."""
-        instance.is_active = False
-        instance.save()
+        """Disable membership and free its place in the circle.
+        The membership is locked first so concurrent leaves only
+        release the place once.
+        """
+        with transaction.atomic():
+            instance = Membership.objects.select_for_update().get(pk=instance.pk)
+            if not instance.is_active:
+                return
+            instance.is_active = False
+            instance.save()
+            StatsUpdate().add(
+                Circle.objects.filter(pk=instance.circle_id, active_member_count__gt=0),
+                active_member_count=-1
+            ).apply()
+        circle_resolver.invalidate(self.circle.slug_name)
 
     @action(detail=True, methods=['get'])
     def invitations(self, request, *args, **kwargs):
@@ -82,13 +106,13 @@ class MembershipViewSet(mixins.ListModelMixin,
         diff = member.remaining_invitations - len(unused_invitations)
 
         invitations = [x[0] for x in unused_invitations]
-        for i in range(0, diff):
-            invitations.append(
-                Invitation.objects.create(
-                    issued_by=request.user,
-                    circle=self.circle
-                ).code
+        invitations += [
+            invitation.code for invitation in Invitation.objects.create_bulk(
+                diff,
+                issued_by=request.user,
+                circle=self.circle
             )
+        ]
 
         data = {
             'used_invitations': MembershipModelSerializer(invited_members, many=True).data,
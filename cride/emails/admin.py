@@ -0,0 +1,16 @@
+"""Emails admin."""
+
+# Django
+from django.contrib import admin
+
+# Models
+from cride.emails.models import OutgoingEmail
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Outgoing email admin."""
+
+    list_display = ('to', 'subject', 'status', 'attempts', 'send_after', 'sent_at')
+    search_fields = ('to', 'subject')
+    list_filter = ('status',)
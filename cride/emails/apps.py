@@ -0,0 +1,9 @@
+"""Emails app."""
+# Django
+from django.apps import AppConfig
+
+
+class EmailsAppConfig(AppConfig):
+    """Emails app config."""
+    name = 'cride.emails'
+    verbose_name = 'Emails'
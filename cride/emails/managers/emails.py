@@ -0,0 +1,36 @@
+"""Outgoing email managers."""
+
+# Django
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class OutgoingEmailManager(models.Manager):
+    """Outgoing email manager.
+    Used to buffer messages and hand them out in batches.
+    """
+
+    def enqueue(self, subject, body, to, from_email, html_body=''):
+        """Buffer a message to be sent by the next drain."""
+        return self.create(
+            subject=subject,
+            body=body,
+            html_body=html_body,
+            to=to,
+            from_email=from_email
+        )
+
+    def claim(self, limit, lease):
+        """Return up to limit pending messages due for delivery.
+        Claimed messages are pushed lease into the future so other
+        workers skip them. If the worker dies before sending them,
+        they are delivered again once the lease expires.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            pks = list(self.select_for_update(skip_locked=True).filter(
+                status=self.model.PENDING,
+                send_after__lte=now
+            ).order_by('send_after', 'pk').values_list('pk', flat=True)[:limit])
+            self.filter(pk__in=pks).update(send_after=now + lease, modified=now)
+        return list(self.filter(pk__in=pks).order_by('pk'))
@@ -0,0 +1 @@
+from .emails import *
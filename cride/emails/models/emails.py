@@ -0,0 +1,58 @@
+"""Outgoing emails models."""
+
+# Django
+from django.db import models
+from django.utils import timezone
+
+# Utilities
+from cride.utils.models import CRideModel
+
+# Managers
+from cride.emails.managers import OutgoingEmailManager
+
+
+class OutgoingEmail(CRideModel):
+    """Outgoing email.
+    Messages are buffered here and delivered in batches by the
+    `send_queued_emails` task, which reuses a single mail connection
+    per run and retries every message on its own.
+    """
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.EmailField()
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    send_after = models.DateTimeField(
+        default=timezone.now,
+        help_text='Messages are not delivered before this date time, used for retries.'
+    )
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    # Manager
+    objects = OutgoingEmailManager()
+
+    class Meta(CRideModel.Meta):
+        """Meta class."""
+
+        indexes = [
+            # Pending messages due, see OutgoingEmailManager.claim
+            models.Index(fields=['status', 'send_after']),
+        ]
+
+    def __str__(self):
+        """Return recipient and subject."""
+        return '{}: {}'.format(self.to, self.subject)
@@ -0,0 +1,73 @@
+"""Email queue drain tests."""
+
+# Django
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase
+
+# Models
+from cride.emails.models import OutgoingEmail
+
+# Tasks
+from cride.taskapp.task import EMAILS_DRAIN_LOCK, send_queued_emails
+
+# Utilities
+from unittest import mock
+
+
+class SendQueuedEmailsTestCase(TestCase):
+    """Delivery of the buffered emails."""
+
+    def setUp(self):
+        cache.clear()
+        for n in range(5):
+            OutgoingEmail.objects.enqueue(
+                'Subject {}'.format(n),
+                'Body',
+                'user{}@comparteride.com'.format(n),
+                'noreply@comparteride.com'
+            )
+
+    def drain(self):
+        """Run the drain counting the connections opened."""
+        with mock.patch.object(EmailBackend, 'open', autospec=True, return_value=True) as connect:
+            sent = send_queued_emails()
+        return sent, connect.call_count
+
+    def test_single_connection(self):
+        """Every message is sent over the same connection."""
+        with self.settings(EMAILS_BATCH_SIZE=2):
+            sent, connections = self.drain()
+        self.assertEqual(sent, 5)
+        self.assertEqual(connections, 1)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.SENT).exists())
+
+    def test_reconnect_after_failure(self):
+        """A failed message is retried later over a new connection."""
+        send_messages = EmailBackend.send_messages
+        calls = []
+
+        def drop_first(backend, messages):
+            calls.append(messages)
+            if len(calls) == 1:
+                raise ConnectionResetError('Connection dropped.')
+            return send_messages(backend, messages)
+
+        with mock.patch.object(EmailBackend, 'send_messages', autospec=True, side_effect=drop_first):
+            sent, connections = self.drain()
+        self.assertEqual(sent, 4)
+        self.assertEqual(connections, 2)
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING, attempts=1).count(), 1)
+
+    def test_overlapping_runs(self):
+        """A run is skipped while another one holds the lock."""
+        cache.add(EMAILS_DRAIN_LOCK, 'other', timeout=60)
+        sent, connections = self.drain()
+        self.assertEqual(sent, 0)
+        self.assertEqual(connections, 0)
+        self.assertEqual(len(mail.outbox), 0)
+        cache.delete(EMAILS_DRAIN_LOCK)
+        self.assertEqual(self.drain()[0], 5)
+        self.assertIsNone(cache.get(EMAILS_DRAIN_LOCK))
@@ -0,0 +1,121 @@
+"""Exports admin."""
+
+# Django
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+# Models
+from cride.exports.models import ExportJob
+
+# Tasks
+from cride.taskapp.task import run_export_job
+
+# Utilities
+import json
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """Export job admin."""
+
+    list_display = (
+        'pk',
+        'kind',
+        'format',
+        'status',
+        'progress',
+        'requested_by',
+        'created',
+        'finished_at',
+        'download'
+    )
+    list_filter = ('kind', 'format', 'status')
+    readonly_fields = (
+        'kind',
+        'format',
+        'params',
+        'requested_by',
+        'status',
+        'total_rows',
+        'processed_rows',
+        'file',
+        'error',
+        'finished_at',
+    )
+
+    def has_add_permission(self, request):
+        """Jobs are created by the export admin actions only."""
+        return False
+
+    def progress(self, obj):
+        """Return the job progress."""
+        return '{}%'.format(obj.progress)
+
+    def download(self, obj):
+        """Return the link to the generated file."""
+        if obj.status != ExportJob.DONE or not obj.file:
+            return '-'
+        url = reverse('admin:exports_exportjob_download', args=[obj.pk])
+        return format_html('<a href="{}">Download</a>', url)
+
+    def get_urls(self):
+        """Add the file download view."""
+        urls = [
+            path(
+                '<int:pk>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='exports_exportjob_download'
+            ),
+        ]
+        return urls + super(ExportJobAdmin, self).get_urls()
+
+    def download_view(self, request, pk):
+        """Stream the generated file to staff allowed to see the job.
+        Export files are private, this view is the only way to get them.
+        """
+        job = get_object_or_404(ExportJob, pk=pk)
+        if not self.has_change_permission(request, job):
+            raise PermissionDenied
+        if job.status != ExportJob.DONE or not job.file:
+            raise Http404('The export file is not available.')
+        response = FileResponse(job.file.open('rb'), content_type='application/octet-stream')
+        response['Content-Disposition'] = 'attachment; filename="{}-{}.{}"'.format(job.kind, job.pk, job.format)
+        return response
+
+
+class ExportJobAdminMixin(object):
+    """Admin mixin enqueueing background export jobs.
+    Large reports are generated by the `run_export_job` task instead
+    of being rendered within the request.
+    """
+
+    def get_export_selection(self, request, queryset):
+        """Return the selection of the export action.
+        When every row of the changelist is selected its query string
+        is stored instead of the ids, which may be millions.
+        """
+        if request.POST.get('select_across') == '1':
+            return {'changelist': request.GET.urlencode()}
+        return {'ids': list(queryset.values_list('pk', flat=True))}
+
+    def enqueue_export(self, request, kind, params, format=ExportJob.CSV):
+        """Create an export job and run it once the request is committed."""
+        job = ExportJob.objects.create(
+            kind=kind,
+            format=format,
+            params=json.dumps(params),
+            requested_by=request.user
+        )
+        transaction.on_commit(lambda: run_export_job.delay(job.pk))
+        url = reverse('admin:exports_exportjob_change', args=[job.pk])
+        self.message_user(request, format_html(
+            'Export <a href="{}">#{}</a> queued, the file will be available there once generated.',
+            url,
+            job.pk
+        ))
+        return job
@@ -0,0 +1,117 @@
+"""Exporters.
+An exporter knows the columns of a report and how to build the
+queryset of its rows out of the job parameters.
+"""
+
+# Django
+from django.contrib import admin
+from django.db.models import Count
+from django.http import HttpRequest, QueryDict
+from django.utils.dateparse import parse_datetime
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+from cride.users.models import Profile
+
+# Utilities
+import abc
+
+
+def get_selection(model, selection, user):
+    """Return the queryset of the admin action selection.
+    Selections spanning the whole changelist store its query string,
+    which is run through the model admin again as `user`. Otherwise
+    they hold the ids of the selected rows.
+    """
+    if 'changelist' in selection:
+        request = HttpRequest()
+        request.method = 'GET'
+        request.GET = QueryDict(selection['changelist'])
+        request.user = user
+        return admin.site._registry[model].get_changelist_instance(request).queryset
+    return model.objects.filter(pk__in=selection['ids'])
+
+
+class Exporter(abc.ABC):
+    """Exporter base class."""
+
+    kind = None
+    header = ()
+    fields = ()
+
+    @abc.abstractmethod
+    def get_queryset(self, params, user):
+        """Return the queryset of the rows `user` asked to export."""
+
+
+class RidesExporter(Exporter):
+    """Rides of circles departing within a date range."""
+
+    kind = 'rides'
+    header = (
+        'id',
+        'circle',
+        'passengers',
+        'departure_location',
+        'departure_date',
+        'arrival_location',
+        'arrival_date',
+        'rating',
+    )
+    fields = (
+        'pk',
+        'offered_in__slug_name',
+        'passengers_count',
+        'departure_location',
+        'departure_date',
+        'arrival_location',
+        'arrival_date',
+        'rating',
+    )
+
+    def get_queryset(self, params, user):
+        """Return the rides of params circles between start and end."""
+        return Ride.objects.filter(
+            offered_in__in=get_selection(Circle, params['circles'], user).values('pk'),
+            departure_date__gte=parse_datetime(params['start']),
+            departure_date__lt=parse_datetime(params['end'])
+        ).annotate(
+            passengers_count=Count('passengers')
+        ).order_by('departure_date', 'pk')
+
+
+class ProfilesExporter(Exporter):
+    """User profiles and their stats."""
+
+    kind = 'profiles'
+    header = (
+        'username',
+        'email',
+        'first_name',
+        'last_name',
+        'reputation',
+        'rides_taken',
+        'rides_offered',
+    )
+    fields = (
+        'user__username',
+        'user__email',
+        'user__first_name',
+        'user__last_name',
+        'reputation',
+        'rides_taken',
+        'rides_offered',
+    )
+
+    def get_queryset(self, params, user):
+        """Return the params profiles."""
+        return get_selection(Profile, params['profiles'], user).order_by('user_id')
+
+
+EXPORTERS = {exporter.kind: exporter for exporter in (RidesExporter(), ProfilesExporter())}
+
+
+def get_exporter(kind):
+    """Return the exporter registered for kind."""
+    return EXPORTERS[kind]
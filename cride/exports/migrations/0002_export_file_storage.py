@@ -0,0 +1,19 @@
+# Generated by Django 2.0.10 on 2026-10-18 14:15
+
+import cride.exports.storage
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file',
+            field=cride.exports.storage.ExportFileField(blank=True),
+        ),
+    ]
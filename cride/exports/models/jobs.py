@@ -0,0 +1,67 @@
+"""Export jobs models."""
+
+# Django
+from django.db import models
+
+# Utilities
+from cride.exports.storage import ExportFileField
+from cride.utils.models import CRideModel
+
+import json
+
+
+class ExportJob(CRideModel):
+    """Export job.
+    A report requested from the admin site and generated by a
+    background task, which writes the file to the private export
+    storage and keeps track of its progress.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    CSV = 'csv'
+    NDJSON = 'ndjson'
+    FORMAT_CHOICES = (
+        (CSV, 'CSV'),
+        (NDJSON, 'NDJSON'),
+    )
+
+    kind = models.CharField(max_length=50, help_text='Exporter generating the report.')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default=CSV)
+    params = models.TextField(default='{}', help_text='JSON encoded exporter parameters.')
+
+    requested_by = models.ForeignKey('users.User', on_delete=models.SET_NULL, null=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+
+    file = ExportFileField(blank=True)
+    error = models.TextField(blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def get_params(self):
+        """Return the decoded exporter parameters."""
+        return json.loads(self.params)
+
+    @property
+    def progress(self):
+        """Return the percentage of rows written."""
+        if self.status == self.DONE:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, self.processed_rows * 100 // self.total_rows)
+
+    def __str__(self):
+        """Return kind and status."""
+        return '{} #{}: {}'.format(self.kind, self.pk, self.status)
@@ -0,0 +1,49 @@
+"""Export files storage.
+Reports hold personal data, so they are kept apart from the public
+media in the storage configured by EXPORTS_FILE_STORAGE, under
+random names, and only downloaded through the admin site.
+"""
+
+# Django
+from django.conf import settings
+from django.core.files.storage import get_storage_class
+from django.db import models
+from django.utils.functional import LazyObject
+
+# Utilities
+import os
+import uuid
+
+
+class ExportStorage(LazyObject):
+    """Storage of the export files."""
+
+    def _setup(self):
+        storage_class = get_storage_class(settings.EXPORTS_FILE_STORAGE)
+        self._wrapped = storage_class(**settings.EXPORTS_FILE_STORAGE_OPTIONS)
+
+
+export_storage = ExportStorage()
+
+
+def export_file_name(instance, filename):
+    """Return an unguessable name for an export file keeping its extension."""
+    return 'exports/{}{}'.format(uuid.uuid4().hex, os.path.splitext(filename)[1])
+
+
+class ExportFileField(models.FileField):
+    """File field saving to the export storage.
+    The storage depends on the environment, so it is left out of
+    the migrations.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('storage', export_storage)
+        kwargs.setdefault('upload_to', export_file_name)
+        super(ExportFileField, self).__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super(ExportFileField, self).deconstruct()
+        kwargs.pop('storage', None)
+        kwargs.pop('upload_to', None)
+        return name, path, args, kwargs
@@ -0,0 +1,78 @@
+"""Export jobs tests."""
+
+# Django
+from django.contrib.admin import helpers
+from django.test import TestCase
+from django.urls import reverse
+
+# Models
+from cride.exports.models import ExportJob
+from cride.users.models import Profile
+
+# Exports
+from cride.exports.exporters import get_exporter
+
+# Tasks
+from cride.taskapp.task import run_export_job
+
+# Utilities
+from unittest import mock
+from cride.utils.factories import UserFactory
+
+
+class ExportJobTestCase(TestCase):
+    """Profile exports requested from the admin site."""
+
+    def setUp(self):
+        self.admin = UserFactory(username='admin', is_staff=True, is_superuser=True)
+        self.users = [UserFactory(username='driver{}'.format(n)) for n in range(3)]
+        UserFactory(username='rider')
+        self.client.force_login(self.admin)
+
+    def export(self, query='', **data):
+        """Run the CSV profiles export action on the changelist."""
+        url = reverse('admin:users_profile_changelist') + query
+        data.update({'action': 'export_profiles_csv', 'index': 0})
+        with mock.patch('cride.exports.admin.run_export_job'):
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+        return ExportJob.objects.latest('pk')
+
+    def test_select_across_stores_changelist(self):
+        """Selecting the whole changelist stores its filters, not the ids."""
+        job = self.export(
+            '?q=driver',
+            select_across='1',
+            **{helpers.ACTION_CHECKBOX_NAME: [self.users[0].profile.pk]}
+        )
+        params = job.get_params()
+        self.assertEqual(params['profiles'], {'changelist': 'q=driver'})
+        queryset = get_exporter('profiles').get_queryset(params, self.admin)
+        self.assertEqual(
+            list(queryset.values_list('user__username', flat=True)),
+            ['driver0', 'driver1', 'driver2']
+        )
+
+    def test_selected_ids(self):
+        """Rows picked one by one are stored by id."""
+        profile = Profile.objects.get(user=self.users[1])
+        job = self.export(**{helpers.ACTION_CHECKBOX_NAME: [profile.pk]})
+        self.assertEqual(job.get_params()['profiles'], {'ids': [profile.pk]})
+
+    def test_download(self):
+        """Files get random names and are only served to staff."""
+        job = self.export(**{helpers.ACTION_CHECKBOX_NAME: [self.users[0].profile.pk]})
+        run_export_job(job.pk)
+        job.refresh_from_db()
+        self.addCleanup(job.file.delete, save=False)
+        self.assertRegex(job.file.name, r'^exports/[0-9a-f]{32}\.csv$')
+
+        url = reverse('admin:exports_exportjob_download', args=[job.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertIn(b'driver0@comparteride.com', b''.join(response.streaming_content))
+
+        self.client.force_login(self.users[0])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
@@ -6,3 +6,7 @@ class RidesAppConfig(AppConfig):
     """Rides app config."""
     name = 'cride.rides'
     verbose_name = 'Rides'
+
+    def ready(self):
+        """Register signal handlers."""
+        import cride.rides.signals  # NOQA
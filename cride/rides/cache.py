@@ -0,0 +1,56 @@
+"""Rides cache."""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Utilities
+import hashlib
+from cride.utils.cache import bump_version, get_version
+from cride.utils.routers import reading_replica
+
+RIDES_VERSION_KEY = 'rides:circle:{}:version'
+RIDES_LIST_KEY = 'rides:circle:{}:list:{}:{}'
+
+
+def get_rides_version(circle_id):
+    """Return the version of the circle's rides."""
+    return get_version(RIDES_VERSION_KEY.format(circle_id))
+
+
+def invalidate_rides(circle_id):
+    """Bump the circle's rides version so cached listings are discarded.
+    The version is bumped again once the transaction commits, so pages
+    cached by readers racing with the transaction are discarded too.
+    """
+    if circle_id is None:
+        return
+    key = RIDES_VERSION_KEY.format(circle_id)
+    bump_version(key)
+    transaction.on_commit(lambda: bump_version(key))
+
+
+def get_list_cache_key(circle_id, request):
+    """Return the cache key of a rides listing page."""
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return RIDES_LIST_KEY.format(circle_id, get_rides_version(circle_id), url)
+
+
+def get_cached_list(key):
+    """Return the cached listing page data, None on a miss."""
+    return cache.get(key)
+
+
+def set_cached_list(key, data):
+    """Store a listing page data under the key it was looked up with.
+    The key must be computed before the page is queried, so a page
+    read before a writer commits is stored under the version it was
+    read at and discarded by the bump. Pages read from a replica may
+    miss the latest writes, they are kept no longer than the
+    replication lag allowed for.
+    """
+    timeout = settings.RIDES_LIST_CACHE_TIMEOUT
+    if reading_replica():
+        timeout = min(timeout, settings.DATABASE_REPLICA_LAG)
+    cache.set(key, data, timeout)
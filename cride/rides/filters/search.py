@@ -0,0 +1,51 @@
+"""Ride search filters."""
+
+# Django
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, FloatField, Value, When
+
+# Django REST Framework
+from rest_framework.filters import SearchFilter
+
+# Utilities
+from cride.utils.text import normalize_text
+
+
+class RideSearchFilter(SearchFilter):
+    """Ride location search.
+    Match terms against the normalized `Ride.search_text` column
+    and rank results by relevance. On PostgreSQL the column is backed
+    by a pg_trgm GIN index, so both the containment lookup and the
+    trigram similarity ranking are index assisted. Other databases
+    (SQLite on tests) fall back to a prefix/containment ranking.
+    """
+
+    search_field = 'search_text'
+    rank_field = 'search_rank'
+
+    def filter_queryset(self, request, queryset, view):
+        """Filter and rank rides by the search terms."""
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+        return self.search(queryset, ' '.join(search_terms))
+
+    def search(self, queryset, query):
+        """Return the rides matching every word of query, best matches first."""
+        query = normalize_text(query)
+        for term in query.split(' '):
+            queryset = queryset.filter(**{self.search_field + '__contains': term})
+
+        if connections[queryset.db].vendor == 'postgresql':
+            rank = TrigramSimilarity(self.search_field, query)
+        else:
+            rank = Case(
+                When(**{self.search_field + '__startswith': query, 'then': Value(1.0)}),
+                When(**{self.search_field + '__contains': query, 'then': Value(0.5)}),
+                default=Value(0.0),
+                output_field=FloatField()
+            )
+
+        ordering = queryset.query.order_by
+        return queryset.annotate(**{self.rank_field: rank}).order_by('-' + self.rank_field, *ordering)
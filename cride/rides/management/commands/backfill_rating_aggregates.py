@@ -0,0 +1,37 @@
+"""Rating aggregates backfill command."""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Models
+from cride.rides.models import Rating, Ride
+from cride.users.models import Profile
+
+# Managers
+from cride.rides.managers.ratings import backfill_rating_aggregates
+
+
+class Command(BaseCommand):
+    """Rebuild the ride and profile rating aggregates from the Rating table.
+    Rows are processed in primary key order, one transaction per chunk,
+    so the command can run against a live database and be resumed.
+    """
+
+    help = 'Rebuild rating_sum, rating_count and averages of rides and profiles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--skip-rides', action='store_true')
+        parser.add_argument('--skip-profiles', action='store_true')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if not options['skip_rides']:
+            total = backfill_rating_aggregates(Rating, Ride, 'pk', 'ride_id', 'rating', None, chunk_size)
+            self.stdout.write('Rebuilt {} rides.'.format(total))
+        if not options['skip_profiles']:
+            default = Profile._meta.get_field('reputation').default
+            total = backfill_rating_aggregates(
+                Rating, Profile, 'user_id', 'rated_user_id', 'reputation', default, chunk_size
+            )
+            self.stdout.write('Rebuilt {} profiles.'.format(total))
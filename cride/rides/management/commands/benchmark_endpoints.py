@@ -0,0 +1,185 @@
+"""API endpoints benchmark command."""
+
+# Django
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.authtoken.models import Token
+
+# Utilities
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+from cride.utils.benchmarks import percentile, private_cache
+
+# Cache
+from cride.circles.cache import circle_resolver
+
+
+class Command(BaseCommand):
+    """Measure latency percentiles and SQL queries of the hot endpoints.
+    A synthetic circle is built for every scale with the model
+    factories: `scale` members and `scale` upcoming rides. Data is
+    rolled back once the benchmark finishes, requests that write are
+    rolled back one by one so every call measures the same work.
+    Requests use a private in-process cache.
+    """
+
+    help = 'Benchmark the ride, membership and user endpoints over synthetic datasets.'
+
+    ENDPOINTS = (
+        'ride_list',
+        'ride_join',
+        'ride_rate',
+        'member_list',
+        'invitations',
+        'user_retrieve',
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', nargs='+', type=int, default=[100, 1000])
+        parser.add_argument('--endpoints', nargs='+', choices=self.ENDPOINTS, default=list(self.ENDPOINTS))
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--cold', action='store_true', help='Clear the caches before every request.')
+        parser.add_argument('--output', help='Write the JSON report to this file.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    @override_settings(ALLOWED_HOSTS=['*'])
+    @private_cache()
+    def handle(self, *args, **options):
+        # Factories depend on factory-boy, a local requirement
+        from cride.utils import factories
+
+        self.factories = factories
+        self.random = random.Random(options['seed'])
+        report = {
+            'created': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'cold': options['cold'],
+            'results': [],
+        }
+
+        for scale in sorted(options['scales']):
+            with transaction.atomic():
+                dataset = self.create_dataset(scale)
+                for endpoint in options['endpoints']:
+                    result = {'scale': scale, 'endpoint': endpoint}
+                    result.update(self.measure(dataset, endpoint, options['repeat'], options['cold']))
+                    report['results'].append(result)
+                    self.stdout.write(
+                        '{scale:>7} {endpoint:<14} p50 {p50:>8.2f} ms  p95 {p95:>8.2f} ms  '
+                        'p99 {p99:>8.2f} ms  {queries:>3} queries'.format(**result)
+                    )
+                transaction.set_rollback(True)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write('Report written to {}.'.format(options['output']))
+
+    def create_dataset(self, scale):
+        """Create a circle with scale members and scale upcoming rides."""
+        factories = self.factories
+        suffix = '{}-{}'.format(int(time.time()), scale)
+        circle = factories.CircleFactory(slug_name='benchmark-{}'.format(suffix)[:40])
+        members = [
+            factories.MembershipFactory(
+                circle=circle,
+                is_admin=index == 0,
+                user__username='benchmark-{}-{}'.format(suffix, index),
+                user__password=None
+            ).user
+            for index in range(scale)
+        ]
+
+        departure = timezone.now() + timedelta(hours=2)
+        for index in range(scale):
+            factories.RideFactory(
+                offered_in=circle,
+                offered_by=self.random.choice(members),
+                departure_date=departure + timedelta(minutes=index),
+                passengers=self.random.sample(members, min(2, scale))
+            )
+
+        admin, driver, passenger = members[0], members[1 % scale], members[2 % scale]
+        return {
+            'circle': circle,
+            'admin': admin,
+            'driver': driver,
+            'passenger': passenger,
+            'upcoming': factories.RideFactory(offered_in=circle, offered_by=driver, departure_date=departure),
+            'finished': factories.RideFactory(
+                offered_in=circle,
+                offered_by=driver,
+                departure_date=timezone.now() - timedelta(hours=2),
+                is_active=False,
+                passengers=[passenger]
+            ),
+        }
+
+    def get_request(self, dataset, endpoint):
+        """Return the user, method, path, data and expected status of an endpoint request."""
+        slug_name = dataset['circle'].slug_name
+        rides = '/circles/{}/rides/'.format(slug_name)
+        members = '/circles/{}/members/'.format(slug_name)
+        return {
+            'ride_list': (dataset['passenger'], 'get', rides, None, 200),
+            'ride_join': (
+                dataset['passenger'], 'post', '{}{}/join/'.format(rides, dataset['upcoming'].pk), None, 200
+            ),
+            'ride_rate': (
+                dataset['passenger'], 'post', '{}{}/rate/'.format(rides, dataset['finished'].pk), {'rating': 5}, 201
+            ),
+            'member_list': (dataset['passenger'], 'get', members, None, 200),
+            'invitations': (
+                dataset['admin'], 'get', '{}{}/invitations/'.format(members, dataset['admin'].username), None, 200
+            ),
+            'user_retrieve': (
+                dataset['passenger'], 'get', '/users/{}/'.format(dataset['passenger'].username), None, 200
+            ),
+        }[endpoint]
+
+    def measure(self, dataset, endpoint, repeat, cold):
+        """Request an endpoint repeat times, after a warm up request.
+        Every request runs in a savepoint that is rolled back.
+        """
+        user, method, path, data, status = self.get_request(dataset, endpoint)
+        token, _ = Token.objects.get_or_create(user=user)
+        client = Client(HTTP_AUTHORIZATION='Token {}'.format(token.key))
+        request = getattr(client, method)
+
+        timings, queries = [], []
+        for index in range(repeat + 1):
+            if cold:
+                cache.clear()
+                circle_resolver.get_local().clear()
+            savepoint = transaction.savepoint()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = request(path, data)
+                elapsed = (time.perf_counter() - start) * 1000
+            transaction.savepoint_rollback(savepoint)
+            if response.status_code != status:
+                raise AssertionError('{} {} returned {}: {}'.format(
+                    method.upper(), path, response.status_code, response.content[:200]
+                ))
+            if index:
+                timings.append(elapsed)
+                queries.append(len(captured))
+
+        return {
+            'p50': percentile(timings, 50),
+            'p95': percentile(timings, 95),
+            'p99': percentile(timings, 99),
+            'mean': statistics.mean(timings),
+            'queries': max(queries),
+            'queries_min': min(queries),
+        }
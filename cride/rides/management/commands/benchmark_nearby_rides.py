@@ -0,0 +1,121 @@
+"""Nearby rides benchmark command."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+from cride.users.models import User
+
+# Utilities
+import math
+import random
+import time
+from datetime import timedelta
+from cride.utils.benchmarks import measure
+from cride.utils.geo import covering_cells, geohash_filter, haversine
+
+# Ciudad Universitaria, CDMX
+CENTER = (19.3326, -99.1870)
+
+
+class Command(BaseCommand):
+    """Measure nearby ride lookups over synthetic located rides.
+    Compares the geohash prefix narrowing used by `RideViewSet.nearby`
+    against computing the distance of every ride. Rides are rolled back
+    once the benchmark finishes.
+    """
+
+    help = 'Benchmark geohash narrowed nearby ride lookups against a full scan.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000])
+        parser.add_argument('--radius', nargs='+', type=float, default=[500, 1000, 5000])
+        parser.add_argument('--spread', type=float, default=30000, help='Max distance, in meters, from the center.')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        with transaction.atomic():
+            circle, user = self.create_owner()
+            created = 0
+            for size in sorted(options['sizes']):
+                self.create_rides(circle, user, size - created, options['spread'], options['batch_size'])
+                created = size
+                for radius in options['radius']:
+                    self.report(circle, size, radius, options['repeat'])
+            transaction.set_rollback(True)
+
+    def create_owner(self):
+        """Return the circle and user synthetic rides belong to."""
+        suffix = str(int(time.time()))
+        user = User.objects.create(
+            email='benchmark-{}@comparteride.com'.format(suffix),
+            username='benchmark-{}'.format(suffix)
+        )
+        circle = Circle.objects.create(
+            name='Benchmark',
+            slug_name='benchmark-{}'.format(suffix),
+            about='Nearby rides benchmark'
+        )
+        return circle, user
+
+    def random_point(self, spread):
+        """Return a random point at most spread meters away from the center."""
+        distance = spread * math.sqrt(self.random.random())
+        bearing = self.random.uniform(0, 2 * math.pi)
+        d_lat = distance * math.cos(bearing) / 111320
+        d_lon = distance * math.sin(bearing) / (111320 * math.cos(math.radians(CENTER[0])))
+        return CENTER[0] + d_lat, CENTER[1] + d_lon
+
+    def create_rides(self, circle, user, amount, spread, batch_size):
+        """Bulk create amount randomly located rides."""
+        now = timezone.now()
+        while amount > 0:
+            batch = []
+            for _ in range(min(batch_size, amount)):
+                latitude, longitude = self.random_point(spread)
+                departure = now + timedelta(minutes=self.random.randint(10, 60 * 24 * 30))
+                ride = Ride(
+                    offered_by=user,
+                    offered_in=circle,
+                    departure_location='Synthetic',
+                    arrival_location='Synthetic',
+                    departure_latitude=latitude,
+                    departure_longitude=longitude,
+                    departure_date=departure,
+                    arrival_date=departure + timedelta(hours=1),
+                )
+                ride.departure_geohash = ride.build_departure_geohash()
+                batch.append(ride)
+            Ride.objects.bulk_create(batch)
+            amount -= len(batch)
+
+    def report(self, circle, size, radius, repeat):
+        """Print latency percentiles and candidate counts for a radius."""
+        feed = Ride.objects.filter(offered_in=circle, is_active=True).order_by()
+        latitude, longitude = CENTER
+
+        def within(queryset):
+            rides = queryset.values_list('pk', 'departure_latitude', 'departure_longitude')
+            return [pk for pk, lat, lng in rides if haversine(latitude, longitude, lat, lng) <= radius]
+
+        cells = geohash_filter('departure_geohash', covering_cells(latitude, longitude, radius))
+
+        narrowed = measure(lambda: within(feed.filter(cells)), repeat)
+        scan = measure(lambda: within(feed), repeat)
+        self.stdout.write(
+            '{size:>9} rides  radius={radius:>7.0f}m  matches={matches:<6} candidates={candidates:<7} '
+            'geohash p50={0[0]:.2f}ms p95={0[1]:.2f}ms  scan p50={1[0]:.2f}ms p95={1[1]:.2f}ms'.format(
+                narrowed, scan,
+                size=size,
+                radius=radius,
+                matches=len(within(feed.filter(cells))),
+                candidates=feed.filter(cells).count(),
+            )
+        )
@@ -0,0 +1,103 @@
+"""Ride search benchmark command."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+from cride.users.models import User
+
+# Filters
+from cride.rides.filters import RideSearchFilter
+
+# Utilities
+import random
+import time
+from datetime import timedelta
+from cride.utils.benchmarks import measure
+
+PLACES = (
+    'Ciudad Universitaria', 'Facultad de Ciencias', 'Metro Copilco', 'Metro Universidad',
+    'Coyoacan Centro', 'Polanco', 'Santa Fe', 'Insurgentes Sur', 'Perisur', 'Tlalpan',
+    'Condesa', 'Roma Norte', 'Xochimilco', 'Reforma', 'Zocalo', 'Satelite',
+    'Ciudad Satélite', 'Mixcoac', 'San Ángel', 'Estadio Azteca',
+)
+
+
+class Command(BaseCommand):
+    """Measure ride search latency over synthetic rides.
+    Rides are created inside a transaction that is rolled back
+    once the benchmark finishes, so the database is left untouched.
+    """
+
+    help = 'Benchmark the ride location search against a plain ILIKE scan.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[100000, 1000000])
+        parser.add_argument('--queries', nargs='+', default=['copilco', 'ciudad univ', 'san angel', 'roma'])
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        with transaction.atomic():
+            circle, user = self.create_owner()
+            created = 0
+            for size in sorted(options['sizes']):
+                self.create_rides(circle, user, size - created, options['batch_size'])
+                created = size
+                self.report(circle, size, options['queries'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def create_owner(self):
+        """Return the circle and user synthetic rides belong to."""
+        suffix = str(int(time.time()))
+        user = User.objects.create(
+            email='benchmark-{}@comparteride.com'.format(suffix),
+            username='benchmark-{}'.format(suffix)
+        )
+        circle = Circle.objects.create(
+            name='Benchmark',
+            slug_name='benchmark-{}'.format(suffix),
+            about='Ride search benchmark'
+        )
+        return circle, user
+
+    def create_rides(self, circle, user, amount, batch_size):
+        """Bulk create amount random rides."""
+        now = timezone.now()
+        while amount > 0:
+            batch = []
+            for _ in range(min(batch_size, amount)):
+                departure = now + timedelta(minutes=self.random.randint(10, 60 * 24 * 30))
+                ride = Ride(
+                    offered_by=user,
+                    offered_in=circle,
+                    departure_location=self.random.choice(PLACES),
+                    arrival_location=self.random.choice(PLACES),
+                    departure_date=departure,
+                    arrival_date=departure + timedelta(hours=1),
+                )
+                ride.search_text = ride.build_search_text()
+                batch.append(ride)
+            Ride.objects.bulk_create(batch)
+            amount -= len(batch)
+
+    def report(self, circle, size, queries, repeat):
+        """Print latency percentiles for every query."""
+        feed = Ride.objects.filter(offered_in=circle, is_active=True)
+        backend = RideSearchFilter()
+        for query in queries:
+            indexed = measure(lambda: list(backend.search(feed, query)[:20]), repeat)
+            scan = measure(lambda: list(feed.filter(
+                Q(departure_location__icontains=query) | Q(arrival_location__icontains=query)
+            )[:20]), repeat)
+            self.stdout.write(
+                '{size:>9} rides  {query!r:<15} search p50={0[0]:.2f}ms p95={0[1]:.2f}ms  '
+                'ilike p50={1[0]:.2f}ms p95={1[1]:.2f}ms'.format(indexed, scan, size=size, query=query)
+            )
@@ -0,0 +1 @@
+from .ratings import *
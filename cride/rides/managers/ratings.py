@@ -0,0 +1,82 @@
+"""Ride rating managers."""
+
+# Django
+from django.db import models, transaction
+from django.db.models import Count, F, FloatField, Sum
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+
+def running_average_update(rating, average_field):
+    """Return the update values adding rating to a row's running aggregate.
+    Every expression is evaluated against the row's previous values,
+    so the sum, count and average move together in one statement.
+    """
+    return {
+        'rating_sum': F('rating_sum') + rating,
+        'rating_count': F('rating_count') + 1,
+        average_field: Cast(F('rating_sum') + rating, FloatField()) / (F('rating_count') + 1),
+        'modified': timezone.now(),
+    }
+
+
+def backfill_rating_aggregates(rating_model, model, key, rating_key, average_field, default, chunk_size=1000):
+    """Rebuild the rating aggregates of model rows from rating_model, chunk by chunk.
+    `key` is the model field ratings reference through `rating_key`,
+    rows without ratings get `default` as their average. Rows are
+    processed in key order, one transaction per chunk, so the rebuild
+    can run against a live database. Models are passed in so
+    migrations can use their historical versions.
+    Return the number of rows rebuilt.
+    """
+    total, last = 0, None
+    while True:
+        keys = model.objects.order_by(key)
+        if last is not None:
+            keys = keys.filter(**{key + '__gt': last})
+        keys = list(keys.values_list(key, flat=True)[:chunk_size])
+        if not keys:
+            return total
+
+        aggregates = rating_model.objects.filter(
+            **{rating_key + '__in': keys}
+        ).order_by().values(rating_key).annotate(
+            total=Sum('rating'),
+            count=Count('id')
+        )
+        aggregates = {row[rating_key]: (row['total'], row['count']) for row in aggregates}
+
+        with transaction.atomic():
+            for value in keys:
+                rating_sum, rating_count = aggregates.get(value, (0, 0))
+                model.objects.filter(**{key: value}).update(
+                    rating_sum=rating_sum,
+                    rating_count=rating_count,
+                    **{average_field: rating_sum / rating_count if rating_count else default}
+                )
+
+        total += len(keys)
+        last = keys[-1]
+
+
+class RatingManager(models.Manager):
+    """Rating manager.
+    Used to keep the ride and driver rating aggregates up to date.
+    """
+
+    def create(self, **kwargs):
+        """Create the rating and add it to the ride and rated user aggregates."""
+        # Avoid circular imports
+        from cride.rides.models import Ride
+        from cride.users.models import Profile
+
+        with transaction.atomic():
+            rating = super(RatingManager, self).create(**kwargs)
+            Ride.objects.filter(pk=rating.ride_id).update(
+                **running_average_update(rating.rating, 'rating')
+            )
+            if rating.rated_user_id is not None:
+                Profile.objects.filter(user_id=rating.rated_user_id).update(
+                    **running_average_update(rating.rating, 'reputation')
+                )
+        return rating
@@ -0,0 +1,17 @@
+# Generated by Django 2.0.10 on 2026-10-18 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0002_rating'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ride',
+            index=models.Index(fields=['offered_in', 'is_active', 'departure_date'], name='rides_ride_offered_4999c0_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 2.0.10 on 2026-10-18 13:28
+
+from django.db import migrations, models
+
+from cride.utils.text import normalize_text
+
+
+def fill_search_text(apps, schema_editor):
+    """Populate the search column of existing rides."""
+    Ride = apps.get_model('rides', 'Ride')
+    rides = Ride.objects.only('departure_location', 'arrival_location')
+    for ride in rides.iterator():
+        ride.search_text = normalize_text('{} {}'.format(ride.departure_location, ride.arrival_location))
+        ride.save(update_fields=['search_text'])
+
+
+def create_trigram_index(apps, schema_editor):
+    """Index the search column with pg_trgm, PostgreSQL only."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX rides_ride_search_text_trgm_idx '
+        'ON rides_ride USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    """Drop the pg_trgm search index, PostgreSQL only."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS rides_ride_search_text_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0003_auto_20261018_0726'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ride',
+            name='search_text',
+            field=models.CharField(blank=True, editable=False, help_text='Normalized departure and arrival locations, used by the ride search.', max_length=511),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.0.10 on 2026-10-18 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0004_ride_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ride',
+            name='departure_geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Geohash of the departure point, used to find nearby rides.', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='departure_latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='departure_longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.0.10 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+from cride.rides.managers.ratings import backfill_rating_aggregates
+
+
+def backfill_rides(apps, schema_editor):
+    """Rebuild the rating aggregates of existing rides."""
+    Rating = apps.get_model('rides', 'Rating')
+    Ride = apps.get_model('rides', 'Ride')
+    backfill_rating_aggregates(Rating, Ride, 'pk', 'ride_id', 'rating', None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0005_ride_departure_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ride',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rides, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.0.10 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0006_auto_20261018_0734'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ride',
+            index=models.Index(fields=['is_active', 'arrival_date'], name='rides_ride_is_acti_92ea24_idx'),
+        ),
+    ]
@@ -5,6 +5,9 @@ from django.db import models
 # Model
 from cride.utils.models import CRideModel
 
+# Managers
+from cride.rides.managers import RatingManager
+
 
 class Rating(CRideModel):
     """Ride rating
@@ -40,6 +43,9 @@ class Rating(CRideModel):
 
     rating = models.IntegerField(default=1)
 
+    # Manager
+    objects = RatingManager()
+
     def __str__(self):
         """Return summary."""
         return '@{} rated {} @{}'.format(
@@ -5,6 +5,8 @@ from django.db import models
 
 # Utilities
 from cride.utils.models import CRideModel
+from cride.utils.geo import encode_geohash
+from cride.utils.text import normalize_text
 
 class Ride(CRideModel):
     """Ride Model."""
@@ -22,7 +24,28 @@ class Ride(CRideModel):
     arrival_location = models.CharField(max_length=255)
     arrival_date = models.DateTimeField()
 
+    # Location
+    departure_latitude = models.FloatField(null=True, blank=True)
+    departure_longitude = models.FloatField(null=True, blank=True)
+    departure_geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text='Geohash of the departure point, used to find nearby rides.'
+    )
+
+    # Search
+    search_text = models.CharField(
+        max_length=511,
+        blank=True,
+        editable=False,
+        help_text='Normalized departure and arrival locations, used by the ride search.'
+    )
+
     rating = models.FloatField(null=True)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
 
     is_active = models.BooleanField(
         'active status',
@@ -30,6 +53,35 @@ class Ride(CRideModel):
         help_text="Used for disabling the ride or marking it as finished"
     )
 
+    class Meta(CRideModel.Meta):
+        """Meta class."""
+
+        indexes = [
+            # Circle ride feed, see RideViewSet.get_queryset
+            models.Index(fields=['offered_in', 'is_active', 'departure_date']),
+            # Finished rides sweep, see cride.taskapp.task.disable_finished_rides
+            models.Index(fields=['is_active', 'arrival_date']),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Keep the search and geohash columns in sync with the locations."""
+        self.search_text = self.build_search_text()
+        self.departure_geohash = self.build_departure_geohash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            derived = {'search_text', 'departure_geohash'}
+            kwargs['update_fields'] = set(update_fields) | derived
+        super(Ride, self).save(*args, **kwargs)
+
+    def build_search_text(self):
+        """Return the normalized text the ride is searched by."""
+        return normalize_text('{} {}'.format(self.departure_location, self.arrival_location))
+
+    def build_departure_geohash(self):
+        """Return the departure point geohash, empty if it is unknown."""
+        if self.departure_latitude is None or self.departure_longitude is None:
+            return ''
+        return encode_geohash(self.departure_latitude, self.departure_longitude)
 
     def __str__(self):
         """Return ride details."""
@@ -0,0 +1,249 @@
+"""Ride recommendations.
+Rank upcoming rides of the circles a rider belongs to by how close
+they depart to the times the rider usually travels, how similar their
+locations are to the rides already taken and the driver reputation.
+
+Candidate sets are precomputed per rider and kept in the cache along
+with the rider's travel profile, so requests only re-rank the cached
+candidates. Rides created, updated or joined are logged per circle
+and replayed on the candidate sets as they are read, so a ride change
+costs the same whatever the number of members.
+"""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Membership
+from cride.rides.models import Ride
+
+# Utilities
+import math
+from datetime import timedelta
+from cride.utils.cache import bump_version, get_version
+from cride.utils.routers import primary
+
+RECOMMENDATIONS_KEY = 'rides:recommendations:{}'
+CHANGES_VERSION_KEY = 'rides:recommendations:circle:{}:version'
+CHANGE_KEY = 'rides:recommendations:circle:{}:change:{}'
+
+# Changes replayed on a candidate set before it is computed again instead
+MAX_CHANGES = 100
+
+# Ranking weights
+TIME_WEIGHT = 0.4
+LOCATION_WEIGHT = 0.3
+REPUTATION_WEIGHT = 0.2
+SOON_WEIGHT = 0.1
+
+# Minutes around the usual departure times a ride is still a good fit
+TIME_SPREAD = 60
+
+# Number of past rides the rider profile is built from
+HISTORY_SIZE = 50
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def get_minute_of_day(date):
+    """Return the local minute of the day of a date time."""
+    date = timezone.localtime(date)
+    return date.hour * 60 + date.minute
+
+
+def get_places(ride):
+    """Return the set of words of the ride locations."""
+    return set(ride.search_text.split())
+
+
+def build_profile(user):
+    """Return the travel profile of a user, built from the rides taken."""
+    rides = Ride.objects.filter(
+        passengers=user,
+        departure_date__lt=timezone.now()
+    ).order_by('-departure_date').only('departure_date', 'search_text')[:HISTORY_SIZE]
+    minutes, places = [], []
+    for ride in rides:
+        minutes.append(get_minute_of_day(ride.departure_date))
+        places.append(sorted(get_places(ride)))
+    return {'minutes': minutes, 'places': places}
+
+
+def time_score(profile, ride):
+    """Return how close, from 0 to 1, the ride departs to the rider's usual times."""
+    if not profile['minutes']:
+        return 0.5
+    minute = get_minute_of_day(ride.departure_date)
+    distance = min(
+        min(abs(minute - usual), MINUTES_PER_DAY - abs(minute - usual))
+        for usual in profile['minutes']
+    )
+    return math.exp(-(distance / TIME_SPREAD) ** 2)
+
+
+def location_score(profile, ride):
+    """Return the best Jaccard similarity between the ride and past rides locations."""
+    places = get_places(ride)
+    if not places or not profile['places']:
+        return 0.0
+    return max(len(places & set(past)) / len(places | set(past)) for past in profile['places'])
+
+
+def score_ride(profile, ride, reputation):
+    """Return the cached candidate entry of a ride."""
+    return (
+        ride.offered_in_id,
+        ride.departure_date.timestamp(),
+        time_score(profile, ride),
+        location_score(profile, ride),
+        (reputation or 0) / 5.0,
+    )
+
+
+def get_candidate_rides(circle_ids, user_id):
+    """Return the upcoming rides a user could join in the circles."""
+    now = timezone.now()
+    return Ride.objects.filter(
+        offered_in__in=circle_ids,
+        is_active=True,
+        available_seats__gte=1,
+        departure_date__gte=now + timedelta(seconds=60),
+        departure_date__lte=now + timedelta(days=settings.RIDES_RECOMMENDATIONS_HORIZON)
+    ).exclude(
+        offered_by_id=user_id
+    ).exclude(
+        passengers=user_id
+    ).select_related('offered_by__profile').only(
+        'offered_in_id',
+        'departure_date',
+        'search_text',
+        'offered_by__profile__reputation',
+    )
+
+
+def score_candidates(profile, rides):
+    """Return the candidate entries of rides by ride pk."""
+    candidates = {}
+    for ride in rides:
+        driver = ride.offered_by
+        reputation = driver.profile.reputation if driver is not None else 0
+        candidates[ride.pk] = score_ride(profile, ride, reputation)
+    return candidates
+
+
+def keep_best(candidates):
+    """Return the RIDES_RECOMMENDATIONS_SIZE best candidates.
+    They are picked by their score excluding the departure proximity,
+    which changes over time.
+    """
+    size = settings.RIDES_RECOMMENDATIONS_SIZE
+    if len(candidates) <= size:
+        return candidates
+    best = sorted(candidates, key=lambda pk: base_score(candidates[pk]), reverse=True)[:size]
+    return {pk: candidates[pk] for pk in best}
+
+
+def get_change_versions(circle_ids):
+    """Return the version of the ride change log of each circle."""
+    keys = {CHANGES_VERSION_KEY.format(circle_id): circle_id for circle_id in circle_ids}
+    versions = cache.get_many(list(keys))
+    return {circle_id: versions.get(key) or get_version(key) for key, circle_id in keys.items()}
+
+
+def log_ride_change(circle_id, ride_pk):
+    """Log a created, updated or joined ride for the candidate sets of its circle.
+    Must run once the change is committed, so sets replaying it read
+    the ride as changed.
+    """
+    version = bump_version(CHANGES_VERSION_KEY.format(circle_id))
+    cache.set(CHANGE_KEY.format(circle_id, version), ride_pk, settings.RIDES_RECOMMENDATIONS_CACHE_TIMEOUT)
+
+
+def compute_recommendations(user):
+    """Compute and cache the candidate set of a user, then return it.
+    The change log versions are read before the rides, so changes
+    committed meanwhile are replayed on the set later.
+    """
+    profile = build_profile(user)
+    circle_ids = list(Membership.objects.filter(
+        user=user,
+        is_active=True
+    ).values_list('circle_id', flat=True))
+    versions = get_change_versions(circle_ids)
+    candidates = keep_best(score_candidates(profile, get_candidate_rides(circle_ids, user.pk)))
+
+    entry = {'profile': profile, 'circles': circle_ids, 'versions': versions, 'candidates': candidates}
+    cache.set(RECOMMENDATIONS_KEY.format(user.pk), entry, settings.RIDES_RECOMMENDATIONS_CACHE_TIMEOUT)
+    return entry
+
+
+def replay_changes(entry, user):
+    """Apply the ride changes logged since a candidate set was cached.
+    Changed rides are read again and scored, or dropped when the user
+    can no longer book them. Returns None when the log misses changes,
+    the set has to be computed again then.
+    """
+    versions = get_change_versions(entry['circles'])
+    keys = []
+    for circle_id, version in versions.items():
+        since = entry.get('versions', {}).get(circle_id)
+        if since is None or not 0 <= version - since <= MAX_CHANGES:
+            return None
+        keys.extend(CHANGE_KEY.format(circle_id, number) for number in range(since + 1, version + 1))
+    if not keys:
+        return entry
+    changes = cache.get_many(keys)
+    if len(changes) < len(keys):
+        return None
+
+    ride_pks = set(changes.values())
+    candidates = {pk: candidate for pk, candidate in entry['candidates'].items() if pk not in ride_pks}
+    rides = get_candidate_rides(entry['circles'], user.pk).filter(pk__in=ride_pks)
+    candidates.update(score_candidates(entry['profile'], rides))
+
+    entry = dict(entry, versions=versions, candidates=keep_best(candidates))
+    cache.set(RECOMMENDATIONS_KEY.format(user.pk), entry, settings.RIDES_RECOMMENDATIONS_CACHE_TIMEOUT)
+    return entry
+
+
+def get_recommendations(user):
+    """Return the cached candidate set of a user, up to date with the
+    ride changes, computing it on a miss.
+    """
+    entry = cache.get(RECOMMENDATIONS_KEY.format(user.pk))
+    with primary():
+        if entry is not None:
+            entry = replay_changes(entry, user)
+        if entry is None:
+            entry = compute_recommendations(user)
+    return entry
+
+
+def base_score(candidate):
+    """Return the time independent score of a candidate."""
+    _, _, time, location, reputation = candidate
+    return TIME_WEIGHT * time + LOCATION_WEIGHT * location + REPUTATION_WEIGHT * reputation
+
+
+def rank(entry, now=None):
+    """Return the (ride pk, score) of the upcoming candidates, best first.
+    Rides departing sooner get a small boost, rides about to depart
+    are left out.
+    """
+    now = (now or timezone.now()).timestamp()
+    ranked = []
+    for pk, candidate in entry['candidates'].items():
+        hours = (candidate[1] - now) / 3600
+        if hours * 60 < 1:
+            continue
+        score = base_score(candidate) + SOON_WEIGHT / (1 + hours / 24)
+        ranked.append((pk, round(score, 4)))
+    ranked.sort(key=lambda item: (-item[1], item[0]))
+    return ranked
+
+
+def invalidate_recommendations(user_id):
+    """Drop the cached candidate set of a user."""
+    cache.delete(RECOMMENDATIONS_KEY.format(user_id))
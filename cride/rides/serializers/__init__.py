@@ -1 +1,2 @@
 from .rides import *
+from .ratings import *
@@ -1,8 +1,5 @@
 """Ratings serializer"""
 
-# Django
-from django.db.models import Avg
-
 # Djago Rest Framework
 from rest_framework import serializers
 
@@ -51,24 +48,5 @@ class CreateRideRatingSerializer(serializers.ModelSerializer):
             rated_user=offered_by,
             **validated_data
         )
-        # generate de media rating of the ride
-        ride_avg = round(
-            Rating.objects.filter(
-                circle=circle,
-                ride=ride
-            ).aggregate(Avg('rating'))['rating__avg'],
-            1
-        )
-        ride.rating = ride_avg
-        ride.save()
-
-        # update de media rating of the user
-        user_avg = round(
-            Rating.objects.filter(
-                rated_user=offered_by
-            ).aggregate(Avg('rating'))['rating_avg'],
-            1
-        )
-        offered_by.profile.reputation = user_avg
-        offered_by.profile.save()
+        ride.refresh_from_db()
         return ride
@@ -1,17 +1,22 @@
 """Rides serializer"""
 
+# Django
+from django.db import transaction
+from django.db.models import F
+
 # Django Rest Frameword
 from rest_framework import serializers
 
 # Models
-from cride.circles.models import Membership
+from cride.circles.cache import circle_resolver, get_active_membership
 from cride.rides.models import Ride
-from cride.users.models import User
+from cride.users.models import User, Profile
 from cride.users.serializers import UserModelSerializer
 
 # Utilities
 from datetime import timedelta
 from django.utils import timezone
+from cride.utils.stats import StatsUpdate
 
 
 
@@ -19,10 +24,15 @@ class CreateRideSerializer(serializers.ModelSerializer):
     """Create ride serializer"""
     offered_by = serializers.HiddenField(default=serializers.CurrentUserDefault())
     available_seats = serializers.IntegerField(min_value=1, max_value=15)
+    departure_latitude = serializers.FloatField(min_value=-90, max_value=90, required=False, allow_null=True)
+    departure_longitude = serializers.FloatField(min_value=-180, max_value=180, required=False, allow_null=True)
 
     class Meta:
         model = Ride
-        exclude = ('offered_in','passengers','rating','is_active')
+        exclude = (
+            'offered_in', 'passengers', 'rating', 'rating_sum', 'rating_count',
+            'is_active', 'search_text', 'departure_geohash'
+        )
 
     def validate_departure_date(self, data):
         """Verify date is not in the past."""
@@ -43,18 +53,18 @@ class CreateRideSerializer(serializers.ModelSerializer):
 
         user = data['offered_by']
         circle = self.context['circle']
-        try:
-            membership = Membership.objects.get(
-                user=user,
-                circle=circle,
-                is_active=True
-            )
-        except Membership.DoesNotExist:
+        membership = get_active_membership(user, circle, self.context.get('request'))
+        if membership is None:
             raise serializers.ValidationError('User is not an active member of the circle.')
 
         if data['arrival_date'] <= data['departure_date']:
             raise serializers.ValidationError('Departure date must happen after arrival date.')
 
+        latitude = data.get('departure_latitude')
+        longitude = data.get('departure_longitude')
+        if (latitude is None) != (longitude is None):
+            raise serializers.ValidationError('Departure latitude and longitude must be provided together.')
+
         self.context['membership'] = membership
         return data
 
@@ -63,19 +73,15 @@ class CreateRideSerializer(serializers.ModelSerializer):
         circle = self.context['circle']
         ride = Ride.objects.create(**data, offered_in=circle)
 
-        # Circle
-        circle.rides_offered += 1
-        circle.save()
-
-        # Membership
-        membership = self.context['membership']
-        membership.rides_offered += 1
-        membership.save()
-
-        # Profile
-        profile = data['offered_by'].profile
-        profile.rides_offered += 1
-        profile.save()
+        # Profile, membership and circle stats
+        StatsUpdate().add(
+            Profile.objects.filter(user=data['offered_by']), rides_offered=1
+        ).add(
+            self.context['membership'], rides_offered=1
+        ).add(
+            circle, rides_offered=1
+        ).apply()
+        circle_resolver.invalidate(circle.slug_name)
 
         return ride
 
@@ -87,11 +93,13 @@ class RideModelSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Ride
-        fields = '__all__'
+        exclude = ('search_text', 'departure_geohash')
         read_only_fields = (
             'offered_by',
             'offered_in',
-            'rating'
+            'rating',
+            'rating_sum',
+            'rating_count'
         )
 
     def update(self, instance, validated_data):
@@ -101,6 +109,20 @@ class RideModelSerializer(serializers.ModelSerializer):
         return super(RideModelSerializer, self).update(instance, validated_data)
 
 
+class NearbyRideSerializer(RideModelSerializer):
+    """Ride model serializer including the distance to the searched point."""
+
+    distance = serializers.FloatField(read_only=True)
+
+
+class NearbyRidesQuerySerializer(serializers.Serializer):
+    """Validate the point and radius nearby rides are searched around."""
+
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    radius = serializers.FloatField(min_value=1, max_value=50000, default=1000)
+
+
 class JoinRideSerializer(serializers.ModelSerializer):
     """Join ride serializer"""
     passenger = serializers.IntegerField()
@@ -112,19 +134,18 @@ class JoinRideSerializer(serializers.ModelSerializer):
 
     def validate_passenger(self, data):
         """Verify passenger exists and is a circle member"""
-        try:
-            user = User.objects.get(pk=data)
-        except User.DoesNotExist:
-            raise serializers.ValidationError('Invalid passenger')
+        request = self.context.get('request')
+        if request is not None and request.user.pk == data:
+            user = request.user
+        else:
+            try:
+                user = User.objects.get(pk=data)
+            except User.DoesNotExist:
+                raise serializers.ValidationError('Invalid passenger')
 
         circle = self.context['circle']
-        try:
-            membership = Membership.objects.get(
-                user=user,
-                circle=circle,
-                is_active=True
-            )
-        except Membership.DoesNotExist:
+        membership = get_active_membership(user, circle, request)
+        if membership is None:
             raise serializers.ValidationError('User is not an active member of the circle.')
 
         self.context['user'] = user
@@ -152,26 +173,38 @@ class JoinRideSerializer(serializers.ModelSerializer):
         ride = self.context['ride']
         user = self.context['user']
         # Ride
-        ride.passengers.add(user)
-        instance.available_seats -= 1
-        instance.save()
-
-        # Profile
-        profile = user.profile
-        profile.rides_taken +=1
-        profile.save()
-
-        # Membership
-        membership = self.context['membership']
-        membership.rides_taken +=1
-        membership.save()
-
-        #Circle
-        circle = self.context['circle']
-        circle.rides_taken += 1
-        circle.save()
+        self.reserve_seat(ride, user)
+
+        # Profile, membership and circle stats
+        StatsUpdate().add(
+            Profile.objects.filter(user=user), rides_taken=1
+        ).add(
+            self.context['membership'], rides_taken=1
+        ).add(
+            self.context['circle'], rides_taken=1
+        ).apply()
+        circle_resolver.invalidate(self.context['circle'].slug_name)
         return ride
 
+    def reserve_seat(self, ride, user):
+        """Take one of the ride's seats for the user.
+        The ride row is locked before the seats and passengers are
+        checked, so concurrent joins can never take more seats than
+        the ride has, nor the same user take two seats. The passenger
+        is added in the same transaction.
+        """
+        with transaction.atomic():
+            seats = Ride.objects.select_for_update().filter(
+                pk=ride.pk
+            ).values_list('available_seats', flat=True).first()
+            if ride.passengers.filter(pk=user.pk).exists():
+                raise serializers.ValidationError('User is already in this ride')
+            if not seats:
+                raise serializers.ValidationError('Ride is already full!')
+            Ride.objects.filter(pk=ride.pk).update(available_seats=F('available_seats') - 1)
+            ride.passengers.add(user)
+        ride.refresh_from_db(fields=['available_seats'])
+
 
 class EndRideSerializer(serializers.ModelSerializer):
     """End ride serializers"""
@@ -192,3 +225,8 @@ class EndRideSerializer(serializers.ModelSerializer):
         return data
 
 
+class RecommendedRideSerializer(RideModelSerializer):
+    """Ride model serializer including the circle and recommendation score."""
+
+    circle = serializers.SlugRelatedField(source='offered_in', slug_field='slug_name', read_only=True)
+    score = serializers.FloatField(read_only=True)
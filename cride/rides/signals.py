@@ -0,0 +1,71 @@
+"""Rides signals."""
+
+# Django
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+# Models
+from cride.circles.models import Membership
+from cride.rides.models import Ride, Rating
+
+# Cache
+from cride.rides.cache import invalidate_rides
+from cride.rides.recommendations import invalidate_recommendations, log_ride_change
+
+
+def schedule_recommendations_refresh(rides):
+    """Log the (pk, circle id) rides for recommendations once the transaction commits."""
+    for pk, circle_id in rides:
+        transaction.on_commit(lambda pk=pk, circle_id=circle_id: log_ride_change(circle_id, pk))
+
+
+@receiver(post_save, sender=Ride)
+@receiver(post_delete, sender=Ride)
+def ride_changed(sender, instance, **kwargs):
+    """Invalidate the cached listings of the ride's circle.
+    Covers ride creation, updates, finishing and rating.
+    """
+    invalidate_rides(instance.offered_in_id)
+
+
+@receiver(post_save, sender=Ride)
+def ride_saved(sender, instance, **kwargs):
+    """Add new rides to recommendations, and drop the ones disabled."""
+    schedule_recommendations_refresh([(instance.pk, instance.offered_in_id)])
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def membership_changed(sender, instance, **kwargs):
+    """Recompute the recommendations of members joining or leaving circles."""
+    invalidate_recommendations(instance.user_id)
+
+
+@receiver(post_save, sender=Rating)
+def rating_created(sender, instance, created, **kwargs):
+    """Invalidate the cached listings once a ride's rating changes."""
+    if created:
+        invalidate_rides(instance.circle_id)
+
+
+@receiver(m2m_changed, sender=Ride.passengers.through)
+def passengers_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate the cached listings when passengers join or leave a ride."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_rides(instance.offered_in_id)
+            schedule_recommendations_refresh([(instance.pk, instance.offered_in_id)])
+        return
+
+    # Changed from the user side, instance is a User.
+    if action in ('post_add', 'post_remove'):
+        rides = Ride.objects.filter(pk__in=pk_set)
+    elif action == 'pre_clear':
+        rides = Ride.objects.filter(passengers=instance)
+    else:
+        return
+    rides = list(rides.values_list('pk', 'offered_in_id'))
+    for circle_id in set(circle_id for _, circle_id in rides):
+        invalidate_rides(circle_id)
+    schedule_recommendations_refresh(rides)
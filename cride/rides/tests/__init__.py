@@ -0,0 +1 @@
+"""Rides tests."""
@@ -0,0 +1,94 @@
+"""Ride listing cache tests."""
+
+# Django
+from django.test import TestCase
+
+# Views
+from cride.rides.views.rides import RideViewSet
+
+# Cache
+from cride.rides.cache import get_rides_version, RIDES_VERSION_KEY
+
+# Utilities
+from unittest import mock
+from cride.utils.cache import bump_version
+from cride.utils.testing import clear_caches, get_client
+from cride.utils.factories import MembershipFactory, RideFactory
+
+
+class RideListCacheTestCase(TestCase):
+    """Cached ride listing pages."""
+
+    def setUp(self):
+        clear_caches()
+        membership = MembershipFactory()
+        self.circle = membership.circle
+        self.ride = RideFactory(offered_in=self.circle, offered_by=membership.user)
+        self.url = '/circles/{}/rides/'.format(self.circle.slug_name)
+        self.client = get_client(membership.user)
+
+    def test_hit(self):
+        """A second read of a page is served from the cache."""
+        first = self.client.get(self.url)
+        with mock.patch.object(RideViewSet, 'paginate_queryset') as paginate:
+            second = self.client.get(self.url)
+        paginate.assert_not_called()
+        self.assertEqual(first.data, second.data)
+
+    def test_write_during_read(self):
+        """A page read while the version is bumped isn't cached under the new version."""
+        paginate = RideViewSet.paginate_queryset
+
+        def paginate_racing_a_write(view, queryset):
+            page = paginate(view, queryset)
+            bump_version(RIDES_VERSION_KEY.format(self.circle.pk))
+            return page
+
+        version = get_rides_version(self.circle.pk)
+        with mock.patch.object(RideViewSet, 'paginate_queryset', paginate_racing_a_write):
+            self.client.get(self.url)
+        self.assertNotEqual(get_rides_version(self.circle.pk), version)
+
+        with mock.patch.object(RideViewSet, 'paginate_queryset', side_effect=paginate, autospec=True) as fresh:
+            self.client.get(self.url)
+        fresh.assert_called_once()
+
+
+class RideETagTestCase(TestCase):
+    """Conditional requests of a ride."""
+
+    def setUp(self):
+        clear_caches()
+        membership = MembershipFactory()
+        self.circle = membership.circle
+        self.passenger = MembershipFactory(circle=self.circle).user
+        self.ride = RideFactory(offered_in=self.circle, passengers=[self.passenger])
+        self.url = '/circles/{}/rides/{}/'.format(self.circle.slug_name, self.ride.pk)
+        self.client = get_client(membership.user)
+
+    def assertChanged(self, etag):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_not_modified(self):
+        """Clients holding the current ETag get a 304."""
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_driver_changes(self):
+        """Changes of the driver's profile change the ETag."""
+        etag = self.client.get(self.url)['ETag']
+        profile = self.ride.offered_by.profile
+        profile.reputation = 4.5
+        profile.save()
+        response = self.assertChanged(etag)
+        self.assertEqual(response.data['offered_by']['profile']['reputation'], 4.5)
+
+    def test_passenger_changes(self):
+        """Changes of a passenger change the ETag."""
+        etag = self.client.get(self.url)['ETag']
+        self.passenger.first_name = 'Pablo'
+        self.passenger.save()
+        response = self.assertChanged(etag)
+        self.assertEqual(response.data['passengers'][0]['first_name'], 'Pablo')
@@ -0,0 +1,104 @@
+"""Ride join tests."""
+
+# Django
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+
+# Django REST Framework
+from rest_framework import serializers
+
+# Models
+from cride.rides.models import Ride
+from cride.users.models import Profile
+
+# Serializers
+from cride.rides.serializers import JoinRideSerializer
+
+# Utilities
+import threading
+from cride.utils.testing import clear_caches, get_client
+from cride.utils.factories import MembershipFactory, RideFactory
+
+
+class JoinRideTestCase(TestCase):
+    """Seat reservation."""
+
+    def setUp(self):
+        clear_caches()
+        driver = MembershipFactory()
+        self.circle = driver.circle
+        self.ride = RideFactory(offered_in=self.circle, offered_by=driver.user, available_seats=3)
+        self.user = MembershipFactory(circle=self.circle).user
+
+    def test_join_twice(self):
+        """A user joining twice only takes one seat."""
+        serializer = JoinRideSerializer()
+        serializer.reserve_seat(self.ride, self.user)
+        with self.assertRaises(serializers.ValidationError):
+            serializer.reserve_seat(Ride.objects.get(pk=self.ride.pk), self.user)
+        self.ride.refresh_from_db()
+        self.assertEqual(self.ride.available_seats, 2)
+        self.assertEqual(self.ride.passengers.count(), 1)
+
+    def test_full_ride(self):
+        """No seat is taken once the ride is full."""
+        self.ride.available_seats = 0
+        self.ride.save()
+        with self.assertRaises(serializers.ValidationError):
+            JoinRideSerializer().reserve_seat(self.ride, self.user)
+        self.assertFalse(self.ride.passengers.exists())
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class JoinRideContentionTestCase(TransactionTestCase):
+    """Concurrent joins, run against databases with row locks."""
+
+    seats = 3
+    riders = 8
+
+    def setUp(self):
+        clear_caches()
+        driver = MembershipFactory()
+        self.circle = driver.circle
+        self.ride = RideFactory(offered_in=self.circle, offered_by=driver.user, available_seats=self.seats)
+        self.url = '/circles/{}/rides/{}/join/'.format(self.circle.slug_name, self.ride.pk)
+
+    def join_concurrently(self, users):
+        """Join the ride with every user at once, return the status codes."""
+        clients = [get_client(user) for user in users]
+        barrier = threading.Barrier(len(clients))
+        codes = []
+
+        def join(client):
+            try:
+                barrier.wait()
+                codes.append(client.post(self.url).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=join, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return codes
+
+    def test_concurrent_joins(self):
+        """N riders joining a k seat ride at once leave exactly k passengers."""
+        users = [MembershipFactory(circle=self.circle).user for _ in range(self.riders)]
+        codes = self.join_concurrently(users)
+        self.assertEqual(codes.count(200), self.seats)
+        self.assertEqual(codes.count(400), self.riders - self.seats)
+        self.ride.refresh_from_db()
+        self.assertEqual(self.ride.available_seats, 0)
+        self.assertEqual(self.ride.passengers.count(), self.seats)
+
+    def test_concurrent_duplicate_joins(self):
+        """The same user joining twice at once takes a single seat."""
+        user = MembershipFactory(circle=self.circle).user
+        codes = self.join_concurrently([user, user])
+        self.assertEqual(sorted(codes), [200, 400])
+        self.ride.refresh_from_db()
+        self.assertEqual(self.ride.available_seats, self.seats - 1)
+        self.assertEqual(self.ride.passengers.count(), 1)
+        self.assertEqual(Profile.objects.get(user=user).rides_taken, 1)
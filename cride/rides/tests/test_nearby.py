@@ -0,0 +1,55 @@
+"""Nearby rides tests."""
+
+# Django
+from django.test import TestCase
+
+# Utilities
+from cride.utils.testing import get_client
+from cride.utils.factories import MembershipFactory, RideFactory
+
+
+class NearbyRidesTestCase(TestCase):
+    """Rides leaving near a point."""
+
+    def setUp(self):
+        membership = MembershipFactory()
+        self.circle = membership.circle
+        self.url = '/circles/{}/rides/nearby/'.format(self.circle.slug_name)
+        self.client = get_client(membership.user)
+
+    def create_ride(self, latitude, longitude):
+        return RideFactory(
+            offered_in=self.circle,
+            departure_latitude=latitude,
+            departure_longitude=longitude
+        ).pk
+
+    def get_nearby(self, latitude, longitude, radius):
+        response = self.client.get(self.url, {
+            'latitude': latitude,
+            'longitude': longitude,
+            'radius': radius
+        })
+        self.assertEqual(response.status_code, 200)
+        distances = [ride['distance'] for ride in response.data['results']]
+        self.assertEqual(distances, sorted(distances))
+        self.assertTrue(all(distance <= radius for distance in distances))
+        return [ride['id'] for ride in response.data['results']]
+
+    def test_cells_ending_in_z(self):
+        """Rides in cells ending in z are found, closest first."""
+        closest = self.create_ride(19.4186, -99.15)
+        close = self.create_ride(19.4210, -99.15)
+        self.create_ride(19.4500, -99.15)
+        self.assertTrue(self.circle.ride_set.get(pk=closest).departure_geohash.startswith('9g3qrz'))
+
+        self.assertEqual(self.get_nearby(19.4180, -99.15, 500), [closest, close])
+
+    def test_antimeridian(self):
+        """Rides across the antimeridian are found."""
+        west = self.create_ride(10.0, -179.999)
+        east = self.create_ride(10.0, 179.995)
+        self.create_ride(10.0, -179.98)
+
+        self.assertEqual(self.get_nearby(10.0, 179.999, 1000), [west, east])
+        self.assertEqual(self.get_nearby(10.0, -179.9995, 1000), [west, east])
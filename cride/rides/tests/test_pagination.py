@@ -0,0 +1,66 @@
+"""Ride feed pagination tests."""
+
+# Django
+from django.test import TestCase
+from django.utils import timezone
+
+# Utilities
+from base64 import b64encode
+from datetime import timedelta
+from urllib.parse import urlencode
+from cride.utils.testing import get_client
+from cride.utils.factories import MembershipFactory, RideFactory
+
+
+class RideCursorPaginationTestCase(TestCase):
+    """Keyset pagination of the circle ride feed."""
+
+    def setUp(self):
+        membership = MembershipFactory()
+        self.circle = membership.circle
+        now = timezone.now()
+        for hours, seats in enumerate((2, 4, 1, 3), 1):
+            RideFactory(
+                offered_in=self.circle,
+                offered_by=membership.user,
+                available_seats=seats,
+                departure_date=now + timedelta(hours=hours)
+            )
+        self.url = '/circles/{}/rides/'.format(self.circle.slug_name)
+        self.client = get_client(membership.user)
+
+    def test_pages_follow_the_cursor(self):
+        """Following next links returns every ride once."""
+        seen, url = [], self.url
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [ride['id'] for ride in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(sorted(seen), sorted(self.circle.ride_set.values_list('pk', flat=True)))
+
+    def test_invalid_cursor(self):
+        """Cursors that can't be decoded are rejected with a 404."""
+        for position in ('garbage|1', '2026-13-40T00:00:00|1', 'garbage'):
+            cursor = self.get_cursor(position)
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, position)
+
+    def test_ordering(self):
+        """Feeds asking for another order are offset paginated in that order."""
+        for ordering, field, reverse in (
+            ('-departure_date', 'departure_date', True),
+            ('available_seats', 'available_seats', False),
+            ('-arrival_date', 'arrival_date', True),
+        ):
+            response = self.client.get(self.url, {'ordering': ordering, 'limit': 2})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['count'], 4)
+            values = [ride[field] for ride in response.data['results']]
+            self.assertEqual(values, sorted(values, reverse=reverse), ordering)
+            expected = self.circle.ride_set.order_by(ordering).values_list('pk', flat=True)[:2]
+            self.assertEqual([ride['id'] for ride in response.data['results']], list(expected))
+
+    def get_cursor(self, position):
+        """Encode a cursor pointing at the raw position."""
+        return b64encode(urlencode({'p': position}).encode()).decode()
@@ -0,0 +1,90 @@
+"""Ride endpoints query budget tests."""
+
+# Django
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+# Utilities
+from datetime import timedelta
+from django.utils import timezone
+from cride.utils.testing import clear_caches, get_client
+from cride.utils.factories import MembershipFactory, RideFactory
+
+
+class RideFeedQueriesTestCase(TestCase):
+    """The ride feed loads its relations in a fixed number of queries."""
+
+    def setUp(self):
+        clear_caches()
+        membership = MembershipFactory()
+        self.circle = membership.circle
+        riders = [MembershipFactory(circle=self.circle).user for _ in range(3)]
+        for index in range(12):
+            RideFactory(
+                offered_in=self.circle,
+                offered_by=riders[index % 3],
+                passengers=riders[:index % 3 + 1]
+            )
+        self.url = '/circles/{}/rides/'.format(self.circle.slug_name)
+        self.client = get_client(membership.user)
+        # Resolve the circle, token and membership once
+        self.client.get(self.url, {'warm': 1})
+
+    def count_queries(self, params):
+        """Return the queries run to list an uncached page of rides."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_offset_pages(self):
+        """Offset pages of any size cost the same queries."""
+        self.assertEqual(
+            self.count_queries({'pagination': 'offset', 'limit': 1}),
+            self.count_queries({'pagination': 'offset', 'limit': 12})
+        )
+
+    def test_cursor_pages(self):
+        """Cursor pages cost the same queries as a single ride page."""
+        self.assertEqual(
+            self.count_queries({'pagination': 'offset', 'limit': 1}) - 1,  # no COUNT
+            self.count_queries({})
+        )
+
+
+class CreateRideQueriesTestCase(TestCase):
+    """Ride creation resolves the driver membership once."""
+
+    def setUp(self):
+        clear_caches()
+        membership = MembershipFactory()
+        self.url = '/circles/{}/rides/'.format(membership.circle.slug_name)
+        self.client = get_client(membership.user)
+
+    def create_ride(self):
+        """Create a ride and return the SQL statements it ran."""
+        departure = timezone.now() + timedelta(hours=1)
+        data = {
+            'available_seats': 3,
+            'departure_location': 'Ciudad Universitaria',
+            'departure_date': departure.isoformat(),
+            'arrival_location': 'Polanco',
+            'arrival_date': (departure + timedelta(hours=1)).isoformat(),
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return [query['sql'] for query in queries.captured_queries]
+
+    def count_membership_lookups(self, statements):
+        """Return the membership SELECTs among the statements."""
+        return len([sql for sql in statements if sql.startswith('SELECT') and 'FROM "circles_membership"' in sql])
+
+    def test_membership_lookups(self):
+        """The permission and serializer share one lookup, later requests none."""
+        cold = self.create_ride()
+        self.assertEqual(self.count_membership_lookups(cold), 1)
+        warm = self.create_ride()
+        self.assertEqual(self.count_membership_lookups(warm), 0)
+        self.assertLess(len(warm), len(cold))
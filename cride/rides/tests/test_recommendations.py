@@ -0,0 +1,71 @@
+"""Ride recommendations tests."""
+
+# Django
+from django.core.cache import cache
+from django.test import TestCase
+
+# Models
+from cride.rides.models import Ride
+
+# Recommendations
+from cride.rides import recommendations
+from cride.rides.recommendations import (
+    CHANGE_KEY,
+    CHANGES_VERSION_KEY,
+    RECOMMENDATIONS_KEY,
+    get_recommendations,
+    log_ride_change,
+)
+
+# Utilities
+from unittest import mock
+from cride.utils.testing import clear_caches
+from cride.utils.factories import MembershipFactory, RideFactory
+
+
+class RideRecommendationsTestCase(TestCase):
+    """Candidate sets kept up to date with the ride change log."""
+
+    def setUp(self):
+        clear_caches()
+        driver = MembershipFactory()
+        self.circle = driver.circle
+        self.driver = driver.user
+        self.rider = MembershipFactory(circle=self.circle).user
+        self.ride = RideFactory(offered_in=self.circle, offered_by=self.driver)
+        get_recommendations(self.rider)
+
+    def get_candidates(self):
+        """Return the candidates of the rider, failing if the set is computed again."""
+        with mock.patch.object(recommendations, 'compute_recommendations') as compute:
+            candidates = get_recommendations(self.rider)['candidates']
+        self.assertFalse(compute.called)
+        return candidates
+
+    def test_created_ride(self):
+        """Rides created after the set was cached are added when it is read."""
+        ride = RideFactory(offered_in=self.circle, offered_by=self.driver)
+        log_ride_change(self.circle.pk, ride.pk)
+        self.assertNotIn(ride.pk, cache.get(RECOMMENDATIONS_KEY.format(self.rider.pk))['candidates'])
+        self.assertEqual(set(self.get_candidates()), {self.ride.pk, ride.pk})
+
+    def test_filled_ride(self):
+        """Rides filled after the set was cached are dropped when it is read."""
+        Ride.objects.filter(pk=self.ride.pk).update(available_seats=0)
+        log_ride_change(self.circle.pk, self.ride.pk)
+        self.assertEqual(self.get_candidates(), {})
+
+    def test_missing_change(self):
+        """The set is computed again when the log misses changes."""
+        ride = RideFactory(offered_in=self.circle, offered_by=self.driver)
+        log_ride_change(self.circle.pk, ride.pk)
+        version = cache.get(CHANGES_VERSION_KEY.format(self.circle.pk))
+        cache.delete(CHANGE_KEY.format(self.circle.pk, version))
+        with mock.patch.object(
+            recommendations,
+            'compute_recommendations',
+            wraps=recommendations.compute_recommendations
+        ) as compute:
+            candidates = get_recommendations(self.rider)['candidates']
+        self.assertTrue(compute.called)
+        self.assertEqual(set(candidates), {self.ride.pk, ride.pk})
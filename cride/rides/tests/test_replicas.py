@@ -0,0 +1,93 @@
+"""Replica routing tests."""
+
+# Django
+from django.conf import settings
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, modify_settings, override_settings
+
+# Utilities
+import unittest
+from unittest import mock
+from cride.utils import routers
+from cride.utils.testing import clear_caches, get_client
+from cride.utils.factories import MembershipFactory, RideFactory
+
+ROUTER = 'cride.utils.routers.ReplicaRouter'
+ROUTING_MIDDLEWARE = 'cride.utils.middleware.ReplicaRoutingMiddleware'
+
+
+class ReadYourWritesMixin(object):
+    """Join a ride and read it back, while another client reads it."""
+
+    def setUp(self):
+        clear_caches()
+        driver = MembershipFactory()
+        self.circle = driver.circle
+        self.ride = RideFactory(offered_in=self.circle, offered_by=driver.user)
+        self.rider = MembershipFactory(circle=self.circle).user
+        self.other = MembershipFactory(circle=self.circle).user
+        self.url = '/circles/{}/rides/{}/'.format(self.circle.slug_name, self.ride.pk)
+
+    def request(self, user, method, url):
+        """Return the response and whether any read went to a replica."""
+        raise NotImplementedError
+
+    def test_join_then_retrieve(self):
+        """The client that joined reads the primary, others the replicas."""
+        response, replica = self.request(self.other, 'get', self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(replica)
+
+        response, replica = self.request(self.rider, 'post', self.url + 'join/')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertFalse(replica)
+
+        response, replica = self.request(self.rider, 'get', self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(replica)
+        self.assertIn(self.rider.username, [passenger['username'] for passenger in response.data['passengers']])
+
+        response, replica = self.request(self.other, 'get', self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(replica)
+
+
+@override_settings(DATABASE_REPLICAS=[routers.PRIMARY], DATABASE_ROUTERS=[ROUTER])
+@modify_settings(MIDDLEWARE={'append': ROUTING_MIDDLEWARE})
+class ReplicaRoutingTestCase(ReadYourWritesMixin, TestCase):
+    """Routing decisions, with the primary standing in for the replica."""
+
+    def request(self, user, method, url):
+        reads = []
+        db_for_read = routers.ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            reads.append(routers.reading_replica())
+            return db_for_read(router, model, **hints)
+
+        with mock.patch.object(routers.ReplicaRouter, 'db_for_read', autospec=True, side_effect=record):
+            response = getattr(get_client(user), method)(url)
+        return response, any(reads)
+
+
+@unittest.skipUnless(settings.DATABASE_REPLICAS, 'No database replica configured.')
+@override_settings(DATABASE_ROUTERS=[ROUTER])
+@modify_settings(MIDDLEWARE={'append': ROUTING_MIDDLEWARE})
+class ReplicaReadsTestCase(ReadYourWritesMixin, TransactionTestCase):
+    """Queries actually sent to the configured replica."""
+
+    multi_db = True
+
+    def request(self, user, method, url):
+        alias = settings.DATABASE_REPLICAS[0]
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        client = get_client(user)
+        with mock.patch('cride.utils.routers.random.choice', return_value=alias):
+            with connections[alias].execute_wrapper(record):
+                response = getattr(client, method)(url)
+        return response, bool(queries)
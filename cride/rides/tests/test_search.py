@@ -0,0 +1,56 @@
+"""Ride search tests."""
+
+# Django
+from django.test import TestCase
+
+# Utilities
+from cride.utils.testing import clear_caches, get_client
+from cride.utils.factories import MembershipFactory, RideFactory
+
+
+class RideSearchFilterTestCase(TestCase):
+    """Location search of the circle ride feed."""
+
+    def setUp(self):
+        clear_caches()
+        membership = MembershipFactory()
+        self.circle = membership.circle
+        self.rides = {
+            name: RideFactory(
+                offered_in=self.circle,
+                offered_by=membership.user,
+                departure_location=departure,
+                arrival_location=arrival
+            ).pk
+            for name, departure, arrival in (
+                ('cu', 'Ciudad Universitaria', 'Polanco'),
+                ('santa_fe', 'Santa Fé', 'Coyoacán'),
+                ('polanco', 'Polanco', 'Santa   Fe'),
+            )
+        }
+        self.url = '/circles/{}/rides/'.format(self.circle.slug_name)
+        self.client = get_client(membership.user)
+
+    def search(self, query):
+        """Return the names of the rides found by query, in order."""
+        response = self.client.get(self.url, {'search': query})
+        self.assertEqual(response.status_code, 200)
+        names = {pk: name for name, pk in self.rides.items()}
+        return [names[ride['id']] for ride in response.data['results']]
+
+    def test_accents(self):
+        """Terms match with or without accents and case."""
+        self.assertEqual(self.search('coyoacan'), ['santa_fe'])
+        self.assertEqual(self.search('COYOACÁN'), ['santa_fe'])
+        self.assertEqual(sorted(self.search('fé')), ['polanco', 'santa_fe'])
+
+    def test_every_word(self):
+        """Rides must contain every word of the query."""
+        self.assertEqual(sorted(self.search('santa  fe')), ['polanco', 'santa_fe'])
+        self.assertEqual(self.search('universitaria polanco'), ['cu'])
+        self.assertEqual(self.search('universitaria coyoacan'), [])
+
+    def test_ranking(self):
+        """Rides starting with the query rank before the ones only containing it."""
+        self.assertEqual(self.search('polanco'), ['polanco', 'cu'])
+        self.assertEqual(self.search('santa fe'), ['santa_fe', 'polanco'])
@@ -0,0 +1,100 @@
+"""Finished rides sweep tests."""
+
+# Django
+from django.test import TestCase
+from django.utils import timezone
+
+# Models
+from cride.rides.models import Ride
+
+# Tasks
+from cride.taskapp.task import disable_finished_rides
+
+# Utilities
+from datetime import timedelta
+from unittest import mock
+from cride.utils.testing import clear_caches, get_client
+from cride.utils.factories import MembershipFactory, RideFactory
+
+
+class DisableFinishedRidesTestCase(TestCase):
+    """The sweep disables every arrived ride exactly once, whatever the clock does."""
+
+    def setUp(self):
+        self.start = timezone.now()
+        self.rides = [
+            RideFactory(
+                departure_date=self.start + timedelta(minutes=minutes - 30),
+                arrival_date=self.start + timedelta(minutes=minutes)
+            )
+            for minutes in (-10, 5, 20, 60, 180)
+        ]
+
+    def sweep(self, minutes):
+        """Run the periodic task with the clock at start + minutes."""
+        with mock.patch('django.utils.timezone.now', return_value=self.start + timedelta(minutes=minutes)):
+            return disable_finished_rides()
+
+    def active(self):
+        """Return the arrival offset in minutes of the rides still active."""
+        return [
+            round((ride.arrival_date - self.start).total_seconds() / 60)
+            for ride in Ride.objects.filter(is_active=True).order_by('arrival_date')
+        ]
+
+    def test_regular_ticks(self):
+        """Rides are disabled on the first tick after they arrive."""
+        self.assertEqual(self.sweep(0), 1)
+        self.assertEqual(self.active(), [5, 20, 60, 180])
+        self.assertEqual(self.sweep(5), 1)
+        self.assertEqual(self.active(), [20, 60, 180])
+
+    def test_forward_jump(self):
+        """Ticks skipped by a forward jump are caught up at once."""
+        self.assertEqual(self.sweep(0), 1)
+        self.assertEqual(self.sweep(90), 3)
+        self.assertEqual(self.active(), [180])
+
+    def test_backward_jump(self):
+        """A clock going back neither re-enables nor disables rides early."""
+        self.assertEqual(self.sweep(30), 3)
+        self.assertEqual(self.sweep(-60), 0)
+        self.assertEqual(self.active(), [60, 180])
+        self.assertEqual(self.sweep(61), 1)
+        self.assertEqual(self.active(), [180])
+
+    def test_each_ride_once(self):
+        """Repeated and late ticks never touch an already disabled ride."""
+        self.assertEqual(self.sweep(200), 5)
+        self.assertEqual(self.sweep(200), 0)
+        self.assertEqual(self.sweep(400), 0)
+        self.assertEqual(self.active(), [])
+
+
+class DisableFinishedRidesETagTestCase(TestCase):
+    """The sweep invalidates the cached representations of the rides it disables."""
+
+    def setUp(self):
+        clear_caches()
+        membership = MembershipFactory()
+        now = timezone.now()
+        self.ride = RideFactory(
+            offered_in=membership.circle,
+            offered_by=membership.user,
+            departure_date=now - timedelta(hours=2),
+            arrival_date=now - timedelta(hours=1)
+        )
+        self.url = '/circles/{}/rides/{}/'.format(membership.circle.slug_name, self.ride.pk)
+        self.client = get_client(membership.user)
+
+    def test_retrieve_after_sweep(self):
+        """A disabled ride is served again instead of a 304."""
+        response = self.client.get(self.url)
+        self.assertTrue(response.data['is_active'])
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.assertEqual(disable_finished_rides(), 1)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['is_active'])
@@ -7,8 +7,10 @@ from rest_framework.routers import DefaultRouter
 
 # Views
 from .views import rides as rides_view
+from .views import recommendations as recommendations_view
 route = DefaultRouter()
-route.register(r'circles/(?P<slug_name>[-a-zA-Z0-0_]+)/rides', rides_view.RideViewSet, basename='ride')
+route.register(r'rides/recommended', recommendations_view.RecommendedRideViewSet, basename='recommended-ride')
+route.register(r'circles/(?P<slug_name>[-a-zA-Z0-9_]+)/rides', rides_view.RideViewSet, basename='ride')
 urlpatterns = [
     path('', include(route.urls))
 ]
@@ -0,0 +1,55 @@
+"""Ride recommendations views."""
+
+# Django REST Framework
+from rest_framework import mixins, viewsets
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.permissions import IsAuthenticated
+
+# Models
+from django.db.models import Prefetch
+from cride.rides.models import Ride
+from cride.users.models import User
+
+# Serializers
+from cride.rides.serializers import RecommendedRideSerializer
+
+# Recommendations
+from cride.rides.recommendations import get_recommendations, rank
+
+
+class RecommendedRideViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Recommended rides view set.
+    List upcoming rides across the requesting user's circles, best
+    fit first. Candidates come from the user's precomputed set and
+    are only re-ranked here.
+    """
+
+    serializer_class = RecommendedRideSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = LimitOffsetPagination
+
+    def get_queryset(self):
+        """Return bookable rides along with the data the serializer needs."""
+        return Ride.objects.filter(
+            is_active=True,
+            available_seats__gte=1
+        ).select_related(
+            'offered_by__profile',
+            'offered_in'
+        ).prefetch_related(
+            Prefetch('passengers', queryset=User.objects.select_related('profile'))
+        )
+
+    def list(self, request, *args, **kwargs):
+        """List the ranked rides of the page."""
+        ranked = rank(get_recommendations(request.user))
+        page = self.paginate_queryset(ranked)
+        rides = self.get_queryset().in_bulk([pk for pk, _ in page])
+        results = []
+        for pk, score in page:
+            # Rides filled or disabled since the set was computed are skipped
+            if pk in rides:
+                rides[pk].score = score
+                results.append(rides[pk])
+        serializer = self.get_serializer(results, many=True)
+        return self.get_paginated_response(serializer.data)
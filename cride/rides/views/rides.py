@@ -1,31 +1,53 @@
 """Rides views"""
 # Django Rest Framework
 from rest_framework import mixins, viewsets, status
-from rest_framework.generics import get_object_or_404
 from rest_framework.decorators import action
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import LimitOffsetPagination
 
 # Model
+from django.db.models import Max, Prefetch
 from rest_framework.response import Response
 
-from cride.circles.models import Circle
+from cride.users.models import User
 
 # Permissions
 from cride.circles.permissions.memberships import IsActiveCircleMember
 from rest_framework.permissions import IsAuthenticated
 from cride.rides.permissions import IsRideOwner, IsNotRideOwner
+# Filters
+from cride.rides.filters import RideSearchFilter
+# Cache
+from cride.circles.cache import get_circle_or_404
+from cride.rides.cache import get_cached_list, get_list_cache_key, get_rides_version, set_cached_list
 # Serializers
 from cride.rides.serializers import (
     CreateRideSerializer,
     RideModelSerializer,
     JoinRideSerializer,
     EndRideSerializer,
+    CreateRideRatingSerializer,
+    NearbyRideSerializer,
+    NearbyRidesQuerySerializer,
 )
 # Utilities
+import time
 from datetime import timedelta
+from django.conf import settings
 from django.utils import timezone
+from cride.utils.geo import covering_cells, geohash_filter, haversine
+from cride.utils.mixins import ConditionalGetMixin
+from cride.utils.pagination import KeysetCursorPagination
 
-class RideViewSet(mixins.CreateModelMixin,
+
+class RideCursorPagination(KeysetCursorPagination):
+    """Ride feed pagination keyed on `(departure_date, id)`."""
+
+    ordering = ('departure_date', 'id')
+
+
+class RideViewSet(ConditionalGetMixin,
+                  mixins.CreateModelMixin,
                   mixins.ListModelMixin,
                   mixins.UpdateModelMixin,
                   mixins.RetrieveModelMixin,
@@ -34,27 +56,75 @@ class RideViewSet(mixins.CreateModelMixin,
     serializer_class = CreateRideSerializer
     permission_classes = [IsAuthenticated, IsActiveCircleMember]
 
-    filter_backends = (SearchFilter, OrderingFilter)
+    filter_backends = (OrderingFilter, RideSearchFilter)
     ordering = ('departure_date','arrival_date','available_seats')
-    ordering_fields = ('departire_date','arrival_date','available_seats')
-    search_fields = ('departure_location', 'arrival_location')
+    ordering_fields = ('departure_date','arrival_date','available_seats')
+
+    pagination_class = RideCursorPagination
+    legacy_pagination_class = LimitOffsetPagination
+
+    # Conditional GET
+    etag_actions = ('list', 'retrieve', 'nearby')
 
     def dispatch(self, request, *args, **kwargs):
         """Verify that the circle exists."""
         slug_name = kwargs['slug_name']
-        self.circle = get_object_or_404(Circle, slug_name=slug_name)
+        self.circle = get_circle_or_404(slug_name)
         return super(RideViewSet, self).dispatch(request, *args, **kwargs)
 
+    @property
+    def paginator(self):
+        """Use offset pagination for old clients asking for it.
+        Clients that send `?pagination=offset` or an `offset` param
+        keep the previous `count`/`limit`/`offset` responses. Search
+        and nearby results are ordered by relevance and distance, and
+        `?ordering=` picks another order than the cursor's, so they are
+        offset paginated too.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            legacy = params.get('pagination') == 'offset' or 'offset' in params
+            ranked = params.get(RideSearchFilter.search_param) or self.action == 'nearby'
+            ordered = OrderingFilter.ordering_param in params
+            if legacy or ranked or ordered:
+                self._paginator = self.legacy_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
     def get_permissions(self):
         """Assign permission based on action"""
         permissions = [IsAuthenticated, IsActiveCircleMember]
         if self.action in ['update', 'partial_update','finish']:
             permissions.append(IsRideOwner)
-        if action == 'join':
+        if self.action == 'join':
             permissions.append(IsNotRideOwner)
         return [p() for p in permissions]
 
 
+    def get_etag_validator(self):
+        """Validate with the circle rides version, bumped on every ride change.
+        Retrieved rides also show their driver and passengers, whose
+        changes don't touch the version, so the latest of their users
+        and profiles is added. Listings drop rides as they depart, so
+        their validator rolls over every RIDES_LIST_CACHE_TIMEOUT
+        seconds like the cached pages do.
+        """
+        version = get_rides_version(self.circle.pk)
+        if self.action == 'retrieve':
+            lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            try:
+                people = self.circle.ride_set.filter(pk=lookup).aggregate(
+                    driver=Max('offered_by__modified'),
+                    driver_profile=Max('offered_by__profile__modified'),
+                    passengers=Max('passengers__modified'),
+                    passengers_profiles=Max('passengers__profile__modified')
+                )
+            except (TypeError, ValueError):
+                return None
+            return version, sorted(people.items())
+        return version, int(time.time() // settings.RIDES_LIST_CACHE_TIMEOUT)
+
     def get_serializer_context(self):
         """Add circle to serializer context"""
         context = super(RideViewSet, self).get_serializer_context()
@@ -65,7 +135,7 @@ class RideViewSet(mixins.CreateModelMixin,
         """Return serializer based on action"""
         if self.action == 'create':
             return CreateRideSerializer
-        elif self.action == 'update':
+        elif self.action == 'join':
             return JoinRideSerializer
         elif self.action == 'finish':
             return EndRideSerializer
@@ -74,17 +144,82 @@ class RideViewSet(mixins.CreateModelMixin,
 
         return RideModelSerializer
 
+    def get_base_queryset(self):
+        """Return circle's rides along with the data RideModelSerializer needs.
+        Driver, circle, passengers and their profiles are loaded in
+        a fixed number of queries regardless of the page size.
+        """
+        return self.circle.ride_set.select_related(
+            'offered_by__profile',
+            'offered_in'
+        ).prefetch_related(
+            Prefetch('passengers', queryset=User.objects.select_related('profile'))
+        )
+
     def get_queryset(self):
         """return active circle's ride"""
-        if self.action not in ['finish', 'retrieve']:
+        queryset = self.get_base_queryset()
+        if self.action not in ['finish', 'retrieve', 'rate']:
             offset = timezone.now() + timedelta(seconds=60)
 
-            return self.circle.ride_set.filter(
+            return queryset.filter(
                 departure_date__gte=offset,
                 is_active=True,
                 available_seats__gte=1
             )
-        return self.circle.ride_set.all()
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """List circle's rides.
+        Pages are cached per circle rides version, which is bumped
+        whenever a ride or its passengers change.
+        """
+        key = get_list_cache_key(self.circle.pk, request)
+        data = get_cached_list(key)
+        if data is not None:
+            return Response(data)
+        response = super(RideViewSet, self).list(request, *args, **kwargs)
+        set_cached_list(key, response.data)
+        return response
+
+    def get_ride_data(self, ride):
+        """Serialize a freshly updated ride with its related data preloaded."""
+        ride = self.get_base_queryset().get(pk=ride.pk)
+        return RideModelSerializer(ride).data
+
+    @action(detail=False, methods=['get'])
+    def nearby(self, request, *args, **kwargs):
+        """List upcoming rides leaving near a point, closest first.
+        Candidates are narrowed with the indexed departure geohash
+        prefixes covering the radius, then filtered by their exact
+        haversine distance.
+        """
+        serializer = NearbyRidesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        latitude = serializer.validated_data['latitude']
+        longitude = serializer.validated_data['longitude']
+        radius = serializer.validated_data['radius']
+
+        cells = covering_cells(latitude, longitude, radius)
+        candidates = self.get_queryset().prefetch_related(None).order_by().filter(
+            geohash_filter('departure_geohash', cells)
+        ).values_list(
+            'pk', 'departure_latitude', 'departure_longitude'
+        )
+
+        nearby = []
+        for pk, ride_latitude, ride_longitude in candidates:
+            distance = haversine(latitude, longitude, ride_latitude, ride_longitude)
+            if distance <= radius:
+                nearby.append((distance, pk))
+        nearby.sort()
+
+        page = self.paginate_queryset(nearby)
+        rides = self.get_base_queryset().in_bulk([pk for _, pk in page])
+        for distance, pk in page:
+            rides[pk].distance = round(distance, 1)
+        data = NearbyRideSerializer([rides[pk] for _, pk in page], many=True).data
+        return self.get_paginated_response(data)
 
     @action(detail=True, methods=['post'])
     def join(self,request, *args, **kwargs):
@@ -94,12 +229,12 @@ class RideViewSet(mixins.CreateModelMixin,
         serializer = serializer_class(
             ride,
             data={'passenger':request.user.pk},
-            context={'ride':ride, 'circle':self.circle},
+            context={'ride':ride, 'circle':self.circle, 'request':request},
             partial=True
         )
         serializer.is_valid(raise_exception=True)
         ride = serializer.save()
-        data = RideModelSerializer(ride).data
+        data = self.get_ride_data(ride)
         return Response(data, status=status.HTTP_200_OK)
 
     @action(methods=['post'], detail=True)
@@ -115,7 +250,7 @@ class RideViewSet(mixins.CreateModelMixin,
         )
         serializer.is_valid(raise_exception=True)
         ride = serializer.save()
-        data = RideModelSerializer(ride).data
+        data = self.get_ride_data(ride)
         return Response(data, status=status.HTTP_200_OK)
 
 
@@ -123,11 +258,11 @@ class RideViewSet(mixins.CreateModelMixin,
     def rate(self, request, *args, **kwargs):
         """Rate ride"""
         ride = self.get_object()
-        serializer_class = self.serializer_class()
+        serializer_class = self.get_serializer_class()
         context = self.get_serializer_context()
         context['ride'] = ride
         serializer = serializer_class(data=request.data, context=context)
         serializer.is_valid(raise_exception=True)
         ride = serializer.save()
-        data = RideModelSerializer(ride).data
+        data = self.get_ride_data(ride)
         return Response(data, status=status.HTTP_201_CREATED)
@@ -1,10 +1,14 @@
 """Celery app config."""
 
 import os
+import time
 from celery import Celery
+from celery.signals import task_failure, task_postrun, task_prerun, worker_process_shutdown
 from django.apps import apps, AppConfig
 from django.conf import settings
 
+from cride.utils.metrics import TASK_DURATION, TASK_FAILURES, mark_process_dead
+
 
 if not settings.configured:
     # set the default Django settings module for the 'celery' program.
@@ -28,6 +32,36 @@ class CeleryAppConfig(AppConfig):
         app.autodiscover_tasks(lambda: installed_apps, force=True)
 
 
+# Start time of the tasks running in this process, by task id
+task_starts = {}
+
+
+@task_prerun.connect
+def task_started(task_id=None, **kwargs):
+    """Remember when a task started."""
+    task_starts[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def task_finished(task_id=None, task=None, state=None, **kwargs):
+    """Record the duration of a task."""
+    start = task_starts.pop(task_id, None)
+    if start is not None:
+        TASK_DURATION.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - start)
+
+
+@task_failure.connect
+def task_failed(sender=None, **kwargs):
+    """Count a task failure."""
+    TASK_FAILURES.labels(sender.name).inc()
+
+
+@worker_process_shutdown.connect
+def pool_process_exited(pid=None, **kwargs):
+    """Drop the live gauges of an exiting pool process."""
+    mark_process_dead(pid)
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')  # pragma: no cover
@@ -5,32 +5,55 @@ from datetime import timedelta
 import jwt
 
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.files import File
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F, Q
 from django.template.loader import render_to_string
 from django.utils import timezone
 
 # celery
 from celery.decorators import task, periodic_task
 # Models
+from cride.emails.models import OutgoingEmail
+from cride.exports.models import ExportJob
 from cride.rides.models import Ride
 from cride.users.models import User
 
+# Recommendations
+from cride.rides.recommendations import compute_recommendations
+
+# Cache
+from cride.rides.cache import invalidate_rides
+from cride.utils.cache import cache_lock
+
+# Exports
+from cride.exports.exporters import get_exporter
+from cride.utils.exports import LINE_ENCODERS, queryset_rows
+
+# Utilities
+import logging
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+EMAILS_DRAIN_LOCK = 'emails:drain:lock'
+
 
-@task(name='send_confimation_email', max_retries=3)
 def send_confimation_email(user_pk):
-    """Send account verification link to given user"""
+    """Queue the account verification link of the given user.
+    Only buffers the message, so it is called within the request and
+    delivered by `send_queued_emails`.
+    """
     user = User.objects.get(pk=user_pk)
     verification_token = gen_verification_token(user)
     subject = 'Welcome @{}! verify your accoutn yo start usign Comparte Ride'.format(user.username)
     from_email = 'Comparte Ride <noreply@comparteride.com>'
-    to = user.email
-    text_content = render_to_string(
+    content = render_to_string(
         'emails/users/account_verification.html',
         {'token': verification_token, 'user': user}
     )
-    msg = EmailMultiAlternatives(subject, text_content, from_email, [to])
-    msg.attach_alternative(text_content, "text/html")
-    msg.send()
+    OutgoingEmail.objects.enqueue(subject, content, user.email, from_email, html_body=content)
 
 
 def gen_verification_token(user):
@@ -45,16 +68,211 @@ def gen_verification_token(user):
     return token.decode()
 
 
-@periodic_task(name='disable_finished_ride', run_every=timedelta(seconds=5))
+@periodic_task(name='disable_finished_ride', run_every=timedelta(seconds=settings.RIDES_SWEEP_INTERVAL))
 def disable_finished_rides():
-    """disable finished rides"""
-    now = timezone.now()
+    """Disable finished rides.
+    Every active ride that arrived at or before now is disabled, so rides
+    missed by a late or skipped tick, or by a clock jump, are caught
+    up on the next run. The (is_active, arrival_date) index keeps the
+    scan limited to the rides actually due.
+    """
+    return disable_rides_finished_by(timezone.now())
+
 
-    offset = now + timedelta(seconds=5)
+def disable_rides_finished_by(now):
+    """Disable active rides arrived by now and return how many were disabled.
+    The update skips the ride signals, so the cached listings and ETags
+    of the circles of the disabled rides are invalidated here.
+    """
+    rides = Ride.objects.filter(is_active=True, arrival_date__lte=now)
+    circle_ids = set(rides.order_by().values_list('offered_in_id', flat=True).distinct())
+    disabled = rides.update(is_active=False, modified=timezone.now())
+    for circle_id in circle_ids:
+        invalidate_rides(circle_id)
+    return disabled
 
-    rides = Ride.objects.filter(
-        arrival_date__gte=now,
-        arrival_date__lte=offset,
-        is_active=True
+
+@task(
+    name='run_export_job',
+    soft_time_limit=settings.EXPORTS_TIME_LIMIT,
+    time_limit=settings.EXPORTS_TIME_LIMIT + 60
+)
+def run_export_job(job_pk):
+    """Generate an export job file and return its name.
+    Rows are read and encoded chunk by chunk into a temporary file
+    which is then saved to the export storage. The job progress is
+    updated after every chunk.
+    """
+    job = ExportJob.objects.get(pk=job_pk)
+    jobs = ExportJob.objects.filter(pk=job.pk)
+    exporter = get_exporter(job.kind)
+    chunk_size = settings.EXPORTS_CHUNK_SIZE
+    try:
+        queryset = exporter.get_queryset(job.get_params(), job.requested_by)
+        jobs.update(
+            status=ExportJob.RUNNING,
+            total_rows=queryset.count(),
+            processed_rows=0,
+            modified=timezone.now()
+        )
+
+        rows = track_export_progress(jobs, queryset_rows(queryset, exporter.fields, chunk_size), chunk_size)
+        with tempfile.TemporaryFile() as output:
+            for line in LINE_ENCODERS[job.format](exporter.header, rows):
+                output.write(line.encode('utf-8'))
+            output.seek(0)
+            name = '{}-{}.{}'.format(job.kind, job.pk, job.format)
+            job.file.save(name, File(output), save=False)
+    except Exception as error:
+        jobs.update(
+            status=ExportJob.FAILED,
+            error=str(error),
+            finished_at=timezone.now(),
+            modified=timezone.now()
+        )
+        raise
+
+    jobs.update(
+        status=ExportJob.DONE,
+        file=job.file.name,
+        finished_at=timezone.now(),
+        modified=timezone.now()
     )
-    rides.update(is_active=True)
+    return job.file.name
+
+
+def track_export_progress(jobs, rows, every):
+    """Yield rows, storing the count of rows processed every `every` rows."""
+    processed = 0
+    for row in rows:
+        yield row
+        processed += 1
+        if processed % every == 0:
+            jobs.update(processed_rows=processed, modified=timezone.now())
+    jobs.update(processed_rows=processed, modified=timezone.now())
+
+
+@periodic_task(name='send_queued_emails', run_every=timedelta(seconds=settings.EMAILS_DRAIN_INTERVAL))
+def send_queued_emails():
+    """Deliver buffered emails and return how many were sent.
+    Batches of EMAILS_BATCH_SIZE messages are sent over a single
+    connection, throttled to the rate limit of the email backend,
+    until the queue is empty or EMAILS_DRAIN_TIME seconds passed.
+
+    Runs may last longer than EMAILS_DRAIN_INTERVAL, so a lock shared
+    by the workers skips a run while the previous one is still going,
+    otherwise each of them would apply the rate limit on its own.
+    """
+    with cache_lock(EMAILS_DRAIN_LOCK, settings.EMAILS_DRAIN_TIME * 2) as acquired:
+        if not acquired:
+            return 0
+        return drain_email_queue()
+
+
+def drain_email_queue():
+    """Send claimed batches until the queue is empty or the drain time is over."""
+    rate_limit = settings.EMAILS_RATE_LIMITS.get(settings.EMAIL_BACKEND)
+    interval = 1 / rate_limit if rate_limit else 0
+    lease = timedelta(seconds=settings.EMAILS_DRAIN_TIME * 2)
+    deadline = time.monotonic() + settings.EMAILS_DRAIN_TIME
+
+    emails = OutgoingEmail.objects.claim(settings.EMAILS_BATCH_SIZE, lease)
+    if not emails:
+        return 0
+
+    sent = 0
+    with get_connection() as connection:
+        while emails:
+            sent += send_email_batch(connection, emails, interval, deadline)
+            if time.monotonic() >= deadline:
+                break
+            emails = OutgoingEmail.objects.claim(settings.EMAILS_BATCH_SIZE, lease)
+    return sent
+
+
+def send_email_batch(connection, emails, interval, deadline):
+    """Send emails over connection, one message every interval seconds.
+    Failed messages are retried later with an exponential backoff,
+    up to EMAILS_MAX_ATTEMPTS times, and the connection, which the
+    server may have dropped, is opened again. Messages left when the
+    deadline is reached are released for the next run.
+    """
+    sent_pks = []
+    for index, email in enumerate(emails):
+        if time.monotonic() >= deadline:
+            OutgoingEmail.objects.filter(
+                pk__in=[pending.pk for pending in emails[index:]]
+            ).update(send_after=timezone.now())
+            break
+
+        started = time.monotonic()
+        message = EmailMultiAlternatives(
+            email.subject,
+            email.body,
+            email.from_email,
+            [email.to],
+            connection=connection
+        )
+        if email.html_body:
+            message.attach_alternative(email.html_body, 'text/html')
+        try:
+            if not connection.send_messages([message]):
+                raise RuntimeError('The email backend did not send the message.')
+        except Exception as error:
+            logger.warning('Could not send email %s: %s', email.pk, error)
+            attempts = email.attempts + 1
+            OutgoingEmail.objects.filter(pk=email.pk).update(
+                attempts=attempts,
+                last_error=str(error),
+                status=OutgoingEmail.FAILED if attempts >= settings.EMAILS_MAX_ATTEMPTS else OutgoingEmail.PENDING,
+                send_after=timezone.now() + timedelta(minutes=2 ** attempts),
+                modified=timezone.now()
+            )
+            reconnect(connection)
+        else:
+            sent_pks.append(email.pk)
+
+        elapsed = time.monotonic() - started
+        if elapsed < interval:
+            time.sleep(interval - elapsed)
+
+    now = timezone.now()
+    OutgoingEmail.objects.filter(pk__in=sent_pks).update(
+        status=OutgoingEmail.SENT,
+        attempts=F('attempts') + 1,
+        sent_at=now,
+        modified=now
+    )
+    return len(sent_pks)
+
+
+def reconnect(connection):
+    """Open the email backend connection again after a failed message."""
+    connection.close()
+    try:
+        connection.open()
+    except Exception as error:
+        logger.warning('Could not reconnect to the email backend: %s', error)
+
+
+@periodic_task(
+    name='precompute_recommendations',
+    run_every=timedelta(seconds=settings.RIDES_RECOMMENDATIONS_REFRESH_INTERVAL),
+    soft_time_limit=settings.RIDES_RECOMMENDATIONS_REFRESH_INTERVAL
+)
+def precompute_recommendations():
+    """Recompute the candidate sets of the active riders.
+    Riders are circle members who logged in or took a ride within the
+    last RIDES_RECOMMENDATIONS_ACTIVE_DAYS days.
+    """
+    since = timezone.now() - timedelta(days=settings.RIDES_RECOMMENDATIONS_ACTIVE_DAYS)
+    users = User.objects.filter(
+        Q(last_login__gte=since) | Q(passengers__departure_date__gte=since),
+        is_active=True,
+        membership__is_active=True
+    ).distinct()
+    computed = 0
+    for user in users.iterator():
+        compute_recommendations(user)
+        computed += 1
+    return computed
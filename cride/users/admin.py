@@ -5,8 +5,12 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
 # Models
+from cride.exports.models import ExportJob
 from cride.users.models import User, Profile
 
+# Exports
+from cride.exports.admin import ExportJobAdminMixin
+
 
 class CustomUserAdmin(UserAdmin):
     """User model admin"""
@@ -15,7 +19,7 @@ class CustomUserAdmin(UserAdmin):
 
 
 @admin.register(Profile)
-class ProfileAdmin(admin.ModelAdmin):
+class ProfileAdmin(ExportJobAdminMixin, admin.ModelAdmin):
     """Profile model admin"""
 
     list_display = ('user','reputation', 'rides_taken', 'rides_offered')
@@ -24,5 +28,23 @@ class ProfileAdmin(admin.ModelAdmin):
 
     list_filter = ('reputation',)
 
+    actions = ['export_profiles_csv', 'export_profiles_ndjson']
+
+    def export_profiles(self, request, queryset, format):
+        """Enqueue the export of the selected profiles."""
+        self.enqueue_export(request, 'profiles', {
+            'profiles': self.get_export_selection(request, queryset),
+        }, format)
+
+    def export_profiles_csv(self, request, queryset):
+        """Export the selected profiles as CSV in background."""
+        self.export_profiles(request, queryset, ExportJob.CSV)
+    export_profiles_csv.short_description = 'Export selected profiles (CSV)'
+
+    def export_profiles_ndjson(self, request, queryset):
+        """Export the selected profiles as NDJSON in background."""
+        self.export_profiles(request, queryset, ExportJob.NDJSON)
+    export_profiles_ndjson.short_description = 'Export selected profiles (NDJSON)'
+
 
 admin.site.register(User, CustomUserAdmin)
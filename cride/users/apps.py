@@ -7,3 +7,7 @@ class UsersAppConfig(AppConfig):
     """Users app config"""
     name = 'cride.users'
     verbose_name = 'Users'
+
+    def ready(self):
+        """Register signal handlers."""
+        import cride.users.signals  # NOQA
@@ -0,0 +1,62 @@
+"""Users authentication."""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Django REST Framework
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+# Utilities
+from cride.utils.routers import primary
+
+TOKEN_KEY = 'users:token:{}'
+
+
+def cache_token(key, user):
+    """Store the user owning the token key."""
+    cache.set(TOKEN_KEY.format(key), user, settings.USERS_TOKEN_CACHE_TIMEOUT)
+
+
+def invalidate_token(key):
+    """Drop a cached token.
+    The entry is dropped again once the transaction commits, so
+    tokens cached by readers racing with the transaction are
+    discarded too.
+    """
+    key = TOKEN_KEY.format(key)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def invalidate_user_tokens(user_id):
+    """Drop the cached tokens of a user, now and once the transaction commits."""
+    keys = [TOKEN_KEY.format(key) for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True)]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication backed by the cache.
+    Resolve `token key -> user` from the cache for up to
+    USERS_TOKEN_CACHE_TIMEOUT seconds before falling back to the
+    token and user join. Cached tokens are dropped when the token is
+    deleted or its user is saved (deactivated, password changed...).
+    """
+
+    def authenticate_credentials(self, key):
+        """Return the user and token of the key, reading the cache first."""
+        user = cache.get(TOKEN_KEY.format(key))
+        if user is None:
+            with primary():
+                user, token = super(CachedTokenAuthentication, self).authenticate_credentials(key)
+            cache_token(key, user)
+            return user, token
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return user, Token(key=key, user=user)
@@ -0,0 +1,79 @@
+"""Token authentication benchmark command."""
+
+# Django
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+# Django REST Framework
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+# Models
+from cride.users.models import User, Profile
+
+# Views
+from cride.users.views import UserViewSet
+
+# Authentication
+from cride.users.authentication import CachedTokenAuthentication
+
+# Utilities
+import time
+from cride.utils.benchmarks import private_cache
+
+
+class Command(BaseCommand):
+    """Compare requests per second of the user retrieve endpoint
+    authenticated with DRF's TokenAuthentication and with
+    CachedTokenAuthentication. Data is rolled back afterwards and
+    requests use a private in-process cache.
+    """
+
+    help = 'Benchmark cached token authentication against DRF token authentication.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+
+    @override_settings(ALLOWED_HOSTS=['*'])
+    @private_cache()
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.create_user()
+            token, _ = Token.objects.get_or_create(user=user)
+            client = Client(HTTP_AUTHORIZATION='Token {}'.format(token.key))
+            url = '/users/{}/'.format(user.username)
+
+            original = UserViewSet.authentication_classes
+            try:
+                for authentication in (TokenAuthentication, CachedTokenAuthentication):
+                    UserViewSet.authentication_classes = [authentication]
+                    cache.clear()
+                    self.report(authentication.__name__, client, url, options['requests'])
+            finally:
+                UserViewSet.authentication_classes = original
+            transaction.set_rollback(True)
+
+    def create_user(self):
+        """Return a user to authenticate as."""
+        suffix = str(int(time.time()))
+        user = User.objects.create(
+            email='benchmark-{}@comparteride.com'.format(suffix),
+            username='benchmark-{}'.format(suffix)[:20]
+        )
+        Profile.objects.create(user=user)
+        return user
+
+    def report(self, name, client, url, requests):
+        """Print the requests per second and queries per request."""
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(requests):
+                response = client.get(url)
+                assert response.status_code == 200, response.content
+            elapsed = time.perf_counter() - start
+        self.stdout.write('{:<28} {:>9.1f} req/s  {:.2f} queries/request'.format(
+            name, requests / elapsed, len(queries) / requests
+        ))
@@ -0,0 +1,35 @@
+# Generated by Django 2.0.10 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+from cride.rides.managers.ratings import backfill_rating_aggregates
+
+
+def backfill_profiles(apps, schema_editor):
+    """Rebuild the rating aggregates of existing profiles."""
+    Rating = apps.get_model('rides', 'Rating')
+    Profile = apps.get_model('users', 'Profile')
+    default = Profile._meta.get_field('reputation').default
+    backfill_rating_aggregates(Rating, Profile, 'user_id', 'rated_user_id', 'reputation', default)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('rides', '0002_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_profiles, migrations.RunPython.noop),
+    ]
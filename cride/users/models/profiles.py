@@ -30,6 +30,8 @@ class Profile(CRideModel):
         default=5.0,
         help_text="User's reputation based on the rides taken and offered."
     )
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         """Return user's str representation."""
@@ -11,6 +11,7 @@ from django.core.validators import RegexValidator
 
 # Models
 from cride.users.models import User, Profile
+from cride.users.authentication import cache_token
 from .profiles import ProfileModelSerializer
 
 # Utilities
@@ -85,7 +86,7 @@ class UserSignUpSerializer(serializers.Serializer):
         user = User.objects.create_user(**validated_data, is_verified=False)
         profile = Profile.objects.create(user=user)
         profile.save()
-        send_confimation_email.delay(user_pk=user.pk)
+        send_confimation_email(user_pk=user.pk)
         return validated_data
 
 
@@ -113,6 +114,7 @@ class UserLoginSerializer(serializers.Serializer):
     def create(self, data):
         """Generate or retrieve new token."""
         token, created = Token.objects.get_or_create(user=self.context['user'])
+        cache_token(token.key, self.context['user'])
         return self.context['user'], token.key
 
 
@@ -0,0 +1,101 @@
+"""Token authentication tests."""
+
+# Django
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+
+# Django REST Framework
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+
+# Authentication
+from cride.users.authentication import TOKEN_KEY, CachedTokenAuthentication
+
+# Models
+from cride.users.models import User
+
+# Utilities
+from cride.utils.testing import clear_caches
+from cride.utils.factories import UserFactory
+
+
+class CachedTokenAuthenticationTestCase(TestCase):
+    """Tokens resolved through the cache."""
+
+    def setUp(self):
+        clear_caches()
+        self.user = UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = CachedTokenAuthentication()
+
+    def authenticate(self):
+        return self.authentication.authenticate_credentials(self.token.key)
+
+    def test_cached(self):
+        """Tokens are looked up once."""
+        with self.assertNumQueries(1):
+            user, token = self.authenticate()
+        with self.assertNumQueries(0):
+            cached_user, cached_token = self.authenticate()
+        self.assertEqual(cached_user, user)
+        self.assertEqual(cached_token.key, token.key)
+
+    def test_invalid_token(self):
+        """Unknown tokens are rejected."""
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authentication.authenticate_credentials('unknown')
+
+    def test_deactivated_user(self):
+        """Deactivated users are rejected right away."""
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_password_change(self):
+        """Users changing their password are read again."""
+        self.authenticate()
+        self.user.set_password('new password')
+        self.user.save()
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate()
+        self.assertTrue(user.check_password('new password'))
+
+    def test_deleted_token(self):
+        """Deleted tokens are rejected right away."""
+        key = self.token.key
+        self.authenticate()
+        self.token.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authentication.authenticate_credentials(key)
+
+
+class TokenInvalidationTestCase(TransactionTestCase):
+    """Cached tokens dropped on commit."""
+
+    def setUp(self):
+        clear_caches()
+        self.user = UserFactory()
+        self.token = Token.objects.create(user=self.user)
+
+    def test_racing_reader(self):
+        """Tokens cached before the change commits are dropped too."""
+        stale = User.objects.get(pk=self.user.pk)
+        with transaction.atomic():
+            self.user.is_active = False
+            self.user.save()
+            # A reader outside the transaction still sees the active user.
+            cache.set(TOKEN_KEY.format(self.token.key), stale)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            CachedTokenAuthentication().authenticate_credentials(self.token.key)
+
+    def test_racing_reader_deleted_token(self):
+        """Deleted tokens cached before the deletion commits are dropped too."""
+        key = self.token.key
+        with transaction.atomic():
+            self.token.delete()
+            cache.set(TOKEN_KEY.format(key), self.user)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            CachedTokenAuthentication().authenticate_credentials(key)
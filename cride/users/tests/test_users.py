@@ -0,0 +1,73 @@
+"""Users views tests."""
+
+# Django
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+
+# Cache
+from cride.circles.cache import USER_CIRCLES_KEY, get_user_circles
+
+# Utilities
+from cride.utils.testing import clear_caches, get_client
+from cride.utils.factories import MembershipFactory
+
+
+class UserRetrieveTestCase(TestCase):
+    """User detail and its circles."""
+
+    def setUp(self):
+        clear_caches()
+        self.membership = MembershipFactory()
+        self.user = self.membership.user
+        self.url = '/users/{}/'.format(self.user.username)
+        self.client = get_client(self.user)
+
+    def test_circles(self):
+        """Users get their active circles by default."""
+        MembershipFactory(user=self.user, is_active=False)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['username'], self.user.username)
+        self.assertEqual(
+            [circle['slug_name'] for circle in response.data['circles']],
+            [self.membership.circle.slug_name]
+        )
+
+    def test_left_circle(self):
+        """Circles the user leaves are dropped from the summary."""
+        self.assertEqual(len(self.client.get(self.url).data['circles']), 1)
+        self.membership.is_active = False
+        self.membership.save()
+        self.assertEqual(self.client.get(self.url).data['circles'], [])
+
+    def test_empty_include(self):
+        """`?include=` with no value returns the user alone."""
+        for include in ('', ' , '):
+            response = self.client.get(self.url, {'include': include})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(set(response.data), {'user'})
+
+    def test_other_user(self):
+        """Users can't retrieve other users, nor their circles."""
+        other = MembershipFactory(circle=self.membership.circle).user
+        response = self.client.get('/users/{}/'.format(other.username))
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn('circles', response.data)
+
+
+class UserCirclesInvalidationTestCase(TransactionTestCase):
+    """Cached circles summaries dropped on commit."""
+
+    def setUp(self):
+        clear_caches()
+        self.membership = MembershipFactory()
+
+    def test_racing_reader(self):
+        """Summaries cached before the change commits are dropped too."""
+        user = self.membership.user
+        with transaction.atomic():
+            MembershipFactory(user=user)
+            # A reader outside the transaction still sees one circle.
+            cache.set(USER_CIRCLES_KEY.format(user.pk), [self.membership.circle.slug_name])
+        self.assertEqual(len(get_user_circles(user)), 2)
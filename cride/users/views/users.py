@@ -5,7 +5,6 @@ from rest_framework.decorators import action
 from rest_framework import status, viewsets, mixins
 from rest_framework.response import Response
 # Serializers
-from cride.circles.models import Circle
 from cride.circles.serializers import CircleModelSerializer
 from cride.users.serializers import (
     UserLoginSerializer,
@@ -24,6 +23,9 @@ from rest_framework.permissions import (
 )
 from cride.users.permissions import IsAccountOwner
 
+# Cache
+from cride.circles.cache import circle_resolver, get_user_circles
+
 
 class UserViewSet(mixins.RetrieveModelMixin,
                   mixins.UpdateModelMixin,
@@ -35,6 +37,10 @@ class UserViewSet(mixins.RetrieveModelMixin,
     serializer_class = UserModelSerializer
     lookup_field = 'username'
 
+    # Extra blocks of the retrieve response, selected with `?include=`
+    include_param = 'include'
+    default_include = ('circles',)
+
     def get_permissions(self):
         """Assign permissions based on action"""
         if self.action in ['signup','login','verify']:
@@ -94,16 +100,23 @@ class UserViewSet(mixins.RetrieveModelMixin,
 
 
 
+    def get_include(self):
+        """Return the extra blocks requested, the default ones if not given.
+        `?include=` with no value returns the user alone.
+        """
+        include = self.request.query_params.get(self.include_param)
+        if include is None:
+            return set(self.default_include)
+        return set(name.strip() for name in include.split(',') if name.strip())
+
     def retrieve(self, request, *args, **kwargs):
-        """add extra data to the response"""
-        response = super(UserViewSet, self).retrieve(request, *args, **kwargs)
-        circle = Circle.objects.filter(
-            members=request.user,
-            membership__is_active=True
-        )
-        data = {
-            'user': response.data,
-            'circles': CircleModelSerializer(circle, many=True).data
-        }
-        response.data = data
-        return response
+        """add extra data to the response.
+        The user's circles are built from the cached membership
+        summary and the circle resolver.
+        """
+        user = self.get_object()
+        data = {'user': self.get_serializer(user).data}
+        if 'circles' in self.get_include():
+            circles = circle_resolver.get_many(get_user_circles(user))
+            data['circles'] = CircleModelSerializer(circles, many=True).data
+        return Response(data)
@@ -0,0 +1,42 @@
+"""Benchmark utilities."""
+
+# Django
+from django.test.utils import override_settings
+
+# Utilities
+import statistics
+import time
+
+
+def measure(func, repeat):
+    """Call func repeat times and return its p50 and p95 latency in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return percentile(timings, 50), percentile(timings, 95)
+
+
+def private_cache():
+    """Return settings swapping the default cache for a private one.
+    Benchmarks roll their data back and may clear the cache between
+    requests, so they never touch the cache shared with the workers.
+    """
+    return override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'benchmarks',
+        }
+    })
+
+
+def percentile(values, pct):
+    """Return the nearest-rank percentile of values."""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    if pct == 50:
+        return statistics.median(values)
+    index = max(int(round(pct / 100.0 * len(values))) - 1, 0)
+    return values[index]
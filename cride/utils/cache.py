@@ -0,0 +1,97 @@
+"""Cache utilities."""
+
+# Django
+from django.core.cache import cache
+
+# Utilities
+import contextlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+def get_version(key):
+    """Return the current value of a version counter, creating it if missing.
+    Counters start from the current time in milliseconds, so a counter
+    evicted from the cache never goes back to a version already used.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """Increment a version counter, invalidating everything keyed by it."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        return get_version(key)
+
+
+@contextlib.contextmanager
+def cache_lock(key, timeout):
+    """Hold a lock shared by every worker for the block, if it is free.
+    Yields whether the lock was acquired. The lock expires after
+    timeout seconds so a dead worker never holds it forever, and it is
+    only released by its owner.
+    """
+    token = uuid.uuid4().hex
+    acquired = cache.add(key, token, timeout=timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired and cache.get(key) == token:
+            cache.delete(key)
+
+
+class LocalLRUCache(object):
+    """Bounded, thread safe, in-process LRU cache with a TTL.
+    Entries live in the worker process memory, so they can't be
+    invalidated from other workers, keep ttl short for data that can
+    change. Hits and misses are counted for monitoring.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value, default if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """Store value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Drop the key if it is cached."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,57 @@
+"""Export utilities.
+Encode CSV and NDJSON files row by row so exports hold a single
+chunk of rows in memory no matter how big the result is.
+"""
+
+# Django
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+# Utilities
+import csv
+import json
+
+CHUNK_SIZE = 2000
+
+
+class Echo(object):
+    """File-like object returning what is written to it."""
+
+    def write(self, value):
+        """Return the value instead of buffering it."""
+        return value
+
+
+def csv_lines(header, rows):
+    """Yield the CSV encoded header followed by every row."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(header, rows):
+    """Yield every row as a JSON object keyed by header, one per line."""
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+LINE_ENCODERS = {
+    'csv': csv_lines,
+    'ndjson': ndjson_lines,
+}
+
+
+def queryset_rows(queryset, fields, chunk_size=CHUNK_SIZE):
+    """Yield the values of fields for every row of the queryset.
+    Rows are fetched in chunks of chunk_size without populating the
+    queryset cache.
+    """
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def streaming_csv_response(filename, header, rows):
+    """Return a response streaming rows as a CSV attachment."""
+    response = StreamingHttpResponse(csv_lines(header, rows), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="{}"'.format(filename)
+    return response
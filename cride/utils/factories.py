@@ -0,0 +1,122 @@
+"""Model factories.
+Build synthetic users, circles and rides for benchmarks and local
+data. Requires factory-boy, listed in the local requirements.
+"""
+
+# Django
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.circles.models.invitations import Invitation
+from cride.rides.models import Ride, Rating
+from cride.users.models import User, Profile
+
+# Utilities
+import factory
+from datetime import timedelta
+from cride.utils.stats import StatsUpdate
+
+
+class ProfileFactory(factory.django.DjangoModelFactory):
+    """Profile factory."""
+
+    user = factory.SubFactory('cride.utils.factories.UserFactory', profile=None)
+    biography = factory.Faker('sentence')
+
+    class Meta:
+        model = Profile
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    """User factory, verified and with a profile."""
+
+    username = factory.Sequence(lambda n: 'user{}'.format(n))
+    email = factory.LazyAttribute(lambda user: '{}@comparteride.com'.format(user.username))
+    first_name = factory.Faker('first_name')
+    last_name = factory.Faker('last_name')
+    phone_number = '+525512345678'
+    is_verified = True
+    password = factory.PostGenerationMethodCall('set_password', 'password')
+
+    profile = factory.RelatedFactory(ProfileFactory, 'user')
+
+    class Meta:
+        model = User
+
+
+class CircleFactory(factory.django.DjangoModelFactory):
+    """Circle factory."""
+
+    name = factory.Sequence(lambda n: 'Circle {}'.format(n))
+    slug_name = factory.Sequence(lambda n: 'circle-{}'.format(n))
+    about = factory.Faker('sentence')
+    is_public = True
+    verified = True
+
+    class Meta:
+        model = Circle
+
+
+class MembershipFactory(factory.django.DjangoModelFactory):
+    """Active membership factory."""
+
+    user = factory.SubFactory(UserFactory)
+    profile = factory.LazyAttribute(lambda membership: membership.user.profile)
+    circle = factory.SubFactory(CircleFactory)
+    remaining_invitations = 10
+
+    class Meta:
+        model = Membership
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        """Count active memberships in the circle stats, as joining does."""
+        membership = super(MembershipFactory, cls)._create(model_class, *args, **kwargs)
+        if membership.is_active:
+            StatsUpdate().add(membership.circle, active_member_count=1).apply()
+        return membership
+
+
+class InvitationFactory(factory.django.DjangoModelFactory):
+    """Unused invitation factory, codes come from InvitationManager."""
+
+    issued_by = factory.SubFactory(UserFactory)
+    circle = factory.SubFactory(CircleFactory)
+
+    class Meta:
+        model = Invitation
+
+
+class RideFactory(factory.django.DjangoModelFactory):
+    """Upcoming ride factory."""
+
+    offered_by = factory.SubFactory(UserFactory)
+    offered_in = factory.SubFactory(CircleFactory)
+    available_seats = 3
+    departure_location = factory.Faker('street_name')
+    arrival_location = factory.Faker('street_name')
+    departure_date = factory.LazyFunction(lambda: timezone.now() + timedelta(hours=2))
+    arrival_date = factory.LazyAttribute(lambda ride: ride.departure_date + timedelta(hours=1))
+
+    class Meta:
+        model = Ride
+
+    @factory.post_generation
+    def passengers(self, create, extracted, **kwargs):
+        """Add the given passengers."""
+        if create and extracted:
+            self.passengers.add(*extracted)
+
+
+class RatingFactory(factory.django.DjangoModelFactory):
+    """Rating factory, created through RatingManager so aggregates are kept."""
+
+    ride = factory.SubFactory(RideFactory)
+    circle = factory.LazyAttribute(lambda rating: rating.ride.offered_in)
+    rating_user = factory.SubFactory(UserFactory)
+    rated_user = factory.LazyAttribute(lambda rating: rating.ride.offered_by)
+    rating = factory.Faker('random_int', min=1, max=5)
+
+    class Meta:
+        model = Rating
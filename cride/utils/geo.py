@@ -0,0 +1,104 @@
+"""Geographic utilities.
+Plain python geohash encoding and haversine distance, so rides
+can be matched by proximity without any spatial database extension.
+"""
+
+# Django
+from django.db.models import Q
+
+# Utilities
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+EARTH_RADIUS = 6371008.8  # meters
+
+GEOHASH_PRECISION = 9
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Return the geohash of the given point."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash = []
+    bits, bit, even = 0, 0, True
+    while len(geohash) < precision:
+        interval, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            geohash.append(BASE32[bits])
+            bits, bit = 0, 0
+    return ''.join(geohash)
+
+
+def cell_size(precision):
+    """Return the (height, width) in degrees of a geohash cell."""
+    lat_bits = (5 * precision) // 2
+    lon_bits = 5 * precision - lat_bits
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covering_cells(latitude, longitude, radius, max_cells=16):
+    """Return the geohash prefixes covering radius meters around a point.
+    Use the finest precision whose cells cover the bounding box of
+    the circle with at most max_cells cells.
+    """
+    meters_per_degree = math.pi * EARTH_RADIUS / 180
+    d_lat = radius / meters_per_degree
+    d_lon = radius / (meters_per_degree * max(math.cos(math.radians(latitude)), 1e-6))
+    south, north = max(latitude - d_lat, -90.0), min(latitude + d_lat, 90.0)
+    west, east = longitude - d_lon, longitude + d_lon
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = range(int((south + 90) // height), int((north + 90) // height) + 1)
+        columns = range(int((west + 180) // width), int((east + 180) // width) + 1)
+        if len(rows) * len(columns) <= max_cells:
+            break
+
+    cells = set()
+    for row in rows:
+        cell_latitude = min(-90 + (row + 0.5) * height, 90.0)
+        for column in columns:
+            cell_longitude = (-180 + (column + 0.5) * width + 180) % 360 - 180
+            cells.add(encode_geohash(cell_latitude, cell_longitude, precision))
+    return sorted(cells)
+
+
+def prefix_range(prefix):
+    """Return the (lower, upper) bounds of the geohashes starting with prefix.
+    Upper is None when there is no greater prefix. Comparing against
+    these bounds lets any b-tree index serve the prefix lookup.
+    """
+    head = prefix.rstrip(BASE32[-1])
+    if not head:
+        return prefix, None
+    return prefix, head[:-1] + BASE32[BASE32.index(head[-1]) + 1]
+
+
+def geohash_filter(field, cells):
+    """Return a filter matching the geohashes in field starting with any of cells."""
+    query = Q()
+    for cell in cells:
+        lower, upper = prefix_range(cell)
+        if upper is None:
+            query |= Q(**{field + '__gte': lower})
+        else:
+            query |= Q(**{field + '__gte': lower, field + '__lt': upper})
+    return query
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Return the great circle distance in meters between two points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
@@ -0,0 +1,127 @@
+"""Metrics utilities.
+Prometheus metrics of the API requests and Celery tasks.
+
+Each gunicorn worker or Celery pool process writes its samples to
+memory mapped files in the `prometheus_multiproc_dir` directory when
+that environment variable is set, and the metrics view aggregates
+the files of every process. Without it metrics live in the process
+registry, which is enough for the development server.
+"""
+
+# Django
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+# Prometheus
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Utilities
+import glob
+import os
+
+REQUEST_LATENCY = Histogram(
+    'cride_request_latency_seconds',
+    'API request latency.',
+    ['view', 'method']
+)
+REQUEST_COUNT = Counter(
+    'cride_requests_total',
+    'API requests by response status code.',
+    ['view', 'method', 'status']
+)
+REQUEST_DB_TIME = Histogram(
+    'cride_request_db_seconds',
+    'Database time spent by API requests.',
+    ['view', 'method'],
+    buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, float('inf'))
+)
+TASK_DURATION = Histogram(
+    'cride_task_duration_seconds',
+    'Celery task duration.',
+    ['task', 'state'],
+    buckets=(.01, .05, .1, .5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0, float('inf'))
+)
+TASK_FAILURES = Counter(
+    'cride_task_failures_total',
+    'Celery task failures.',
+    ['task']
+)
+CIRCLE_RESOLVER_LOOKUPS = Counter(
+    'cride_circle_resolver_lookups_total',
+    'Circle resolver lookups by the level that answered them.',
+    ['source']
+)
+CIRCLE_RESOLVER_LOCAL_SIZE = Gauge(
+    'cride_circle_resolver_local_size',
+    'Circles held in the per-worker circle resolver LRU.',
+    multiprocess_mode='livesum'
+)
+
+
+def get_view_name(request):
+    """Return the view label of a request.
+    Viewsets are labelled with their class and action, as in
+    `RideViewSet.join`, other views with their function name.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    view = match.func
+    cls = getattr(view, 'cls', None)
+    if cls is None:
+        return getattr(view, '__name__', match.view_name)
+    actions = getattr(view, 'actions', None) or {}
+    action = actions.get(request.method.lower())
+    return '{}.{}'.format(cls.__name__, action) if action else cls.__name__
+
+
+class DirectoriesCollector(multiprocess.MultiProcessCollector):
+    """Aggregate the metric files of several multiprocess directories.
+    Each container writes to its own directory, so processes of
+    different containers sharing a PID never share a file.
+    """
+
+    def __init__(self, registry, paths):
+        self.paths = paths
+        registry.register(self)
+
+    def collect(self):
+        files = []
+        for path in self.paths:
+            files.extend(glob.glob(os.path.join(path, '*.db')))
+        return self.merge(files, accumulate=True)
+
+
+def get_registry():
+    """Return the registry to expose, aggregating every process if needed."""
+    if 'prometheus_multiproc_dir' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    DirectoriesCollector(registry, [os.environ['prometheus_multiproc_dir']] + settings.METRICS_COLLECT_DIRS)
+    return registry
+
+
+def mark_process_dead(pid):
+    """Drop the live gauges of an exited process."""
+    if 'prometheus_multiproc_dir' in os.environ:
+        multiprocess.mark_process_dead(pid)
+
+
+def metrics_view(request):
+    """Expose the metrics in the Prometheus text format.
+    Scrapers must send METRICS_TOKEN as a bearer token, metrics are
+    never public.
+    """
+    token = settings.METRICS_TOKEN
+    if not token or request.META.get('HTTP_AUTHORIZATION') != 'Bearer {}'.format(token):
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,161 @@
+"""Middleware utilities."""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+# Metrics
+from cride.utils import metrics
+
+# Routers
+from cride.utils import routers
+
+# Utilities
+import contextlib
+import hashlib
+import logging
+import os
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class QueryInstrumentationMiddleware(object):
+    """Count the queries and database time of every request.
+    Every database connection is wrapped with `execute_wrapper` for
+    the duration of the request. Totals are sent back in the
+    `X-DB-Queries` and `X-DB-Time` (milliseconds) headers when
+    SQL_INSTRUMENTATION_HEADERS is set. Statements slower than
+    SQL_SLOW_QUERY_THRESHOLD milliseconds are logged along with the
+    view name and a fingerprint of the project frames that ran them.
+
+    Only two clock reads are added per query, the stack is inspected
+    for slow statements alone.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.headers = settings.SQL_INSTRUMENTATION_HEADERS
+        self.threshold = settings.SQL_SLOW_QUERY_THRESHOLD / 1000
+
+    def __call__(self, request):
+        recorder = QueryRecorder(request, self.threshold)
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        if self.headers:
+            response['X-DB-Queries'] = str(recorder.queries)
+            response['X-DB-Time'] = '{:.2f}'.format(recorder.duration * 1000)
+        return response
+
+
+class QueryRecorder(object):
+    """Execute wrapper accumulating the queries run for a request."""
+
+    def __init__(self, request, threshold):
+        self.request = request
+        self.threshold = threshold  # seconds, None disables the slow query log
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.duration += elapsed
+            if self.threshold is not None and elapsed >= self.threshold:
+                self.log_slow_query(sql, elapsed)
+
+    def log_slow_query(self, sql, elapsed):
+        """Log a slow statement with its view and stack fingerprint."""
+        match = getattr(self.request, 'resolver_match', None)
+        frames = [
+            '{}:{}:{}'.format(os.path.relpath(frame.filename, os.path.dirname(PROJECT_DIR)), frame.lineno, frame.name)
+            for frame in traceback.extract_stack()
+            if frame.filename.startswith(PROJECT_DIR) and frame.filename != __file__
+        ]
+        fingerprint = hashlib.sha1('|'.join(frames).encode()).hexdigest()[:12]
+        logger.warning(
+            'Slow query (%.2f ms) in %s [%s] at %s: %s',
+            elapsed * 1000,
+            match.view_name if match else self.request.path,
+            fingerprint,
+            frames[-1] if frames else '-',
+            sql
+        )
+
+
+class MetricsMiddleware(object):
+    """Record the latency, status code and database time of every request
+    in the Prometheus metrics of `cride.utils.metrics`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder(request, None)
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        view = metrics.get_view_name(request)
+        metrics.REQUEST_LATENCY.labels(view, request.method).observe(elapsed)
+        metrics.REQUEST_DB_TIME.labels(view, request.method).observe(recorder.duration)
+        metrics.REQUEST_COUNT.labels(view, request.method, response.status_code).inc()
+        return response
+
+
+class ReplicaRoutingMiddleware(object):
+    """Read from the replicas on safe-method requests.
+    Requests run inside `routers.replica_reads`, so a request that
+    writes reads the primary from then on. Clients that sent a write
+    keep reading the primary for DATABASE_REPLICA_LAG seconds after
+    it, so they see their own writes until the replicas catch up.
+
+    Clients are told apart by their Authorization header, session
+    cookie or address, in that order, as the token isn't resolved
+    to a user yet when the routing is decided.
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+    PINNED_KEY = 'db:pinned:{}'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.lag = settings.DATABASE_REPLICA_LAG
+
+    def __call__(self, request):
+        key = self.PINNED_KEY.format(self.get_client_key(request))
+        if request.method not in self.SAFE_METHODS or cache.get(key):
+            response = self.get_response(request)
+            written = request.method not in self.SAFE_METHODS
+        else:
+            with routers.replica_reads() as state:
+                response = self.get_response(request)
+            written = state.written
+
+        if written and self.lag:
+            cache.set(key, True, self.lag)
+        return response
+
+    def get_client_key(self, request):
+        """Return a digest identifying the client of the request."""
+        client = (
+            request.META.get('HTTP_AUTHORIZATION') or
+            request.COOKIES.get(settings.SESSION_COOKIE_NAME) or
+            request.META.get('REMOTE_ADDR', '')
+        )
+        return hashlib.sha1(client.encode()).hexdigest()
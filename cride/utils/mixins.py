@@ -0,0 +1,89 @@
+"""View mixins."""
+
+# Django
+from django.db.models import Count, Max
+from django.utils.http import parse_etags, quote_etag
+
+# Django REST Framework
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+# Utilities
+import hashlib
+
+
+class NotModified(APIException):
+    """The client's copy of the resource is still current."""
+
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = 'Not modified.'
+
+
+class ConditionalGetMixin(object):
+    """Conditional GET support for viewsets.
+    An ETag is computed for the actions in `etag_actions` once the
+    request is authenticated and its permissions checked, and
+    `If-None-Match` requests still holding it get a bodyless 304 before
+    the queryset is serialized.
+
+    The ETag is derived from a cheap validator, by default the row
+    count and latest `etag_fields` of the filtered queryset, along
+    with the URL, the Accept header and the user. Viewsets whose data
+    already has a version counter override `get_etag_validator`.
+    """
+
+    etag_actions = ('list',)
+    etag_fields = ('modified',)
+
+    def get_etag_queryset(self):
+        """Return the queryset the validator is aggregated over."""
+        return self.filter_queryset(self.get_queryset())
+
+    def get_etag_validator(self):
+        """Return a value that changes whenever the response would."""
+        aggregates = {'count': Count('pk')}
+        for index, field in enumerate(self.etag_fields):
+            aggregates['last_{}'.format(index)] = Max(field)
+        aggregates = self.get_etag_queryset().order_by().aggregate(**aggregates)
+        return sorted(aggregates.items())
+
+    def get_etag(self, request):
+        """Return the quoted ETag of the response, None to skip it."""
+        validator = self.get_etag_validator()
+        if validator is None:
+            return None
+        parts = (
+            self.action,
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+            request.user.pk,
+            validator,
+        )
+        return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+    def initial(self, request, *args, **kwargs):
+        """Answer 304 when the client's ETag is still current."""
+        super(ConditionalGetMixin, self).initial(request, *args, **kwargs)
+        self.etag = None
+        if request.method not in ('GET', 'HEAD') or self.action not in self.etag_actions:
+            return
+        self.etag = self.get_etag(request)
+        if self.etag is None:
+            return
+        etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etags == ['*'] or self.etag in [etag.replace('W/', '', 1) for etag in etags]:
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        """Return the 304 without a body."""
+        if isinstance(exc, NotModified):
+            return Response(status=exc.status_code, headers={'ETag': self.etag})
+        return super(ConditionalGetMixin, self).handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Send the ETag along with successful responses."""
+        response = super(ConditionalGetMixin, self).finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'etag', None) and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = self.etag
+        return response
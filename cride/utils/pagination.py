@@ -0,0 +1,113 @@
+"""Pagination utilities."""
+
+# Django
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+# Django REST Framework
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Keyset cursor pagination.
+    Paginate over a fixed `(field, pk)` ordering, the cursor stores
+    the position of the last seen row so every page is fetched with
+    a single indexed range query, no COUNT and no OFFSET, no matter
+    how deep the client has scrolled.
+    """
+
+    ordering = ('created', 'id')
+    position_separator = '|'
+
+    def get_ordering(self, request, queryset, view):
+        """Keyset positions only make sense over the fixed ordering."""
+        return tuple(self.ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return a page of results starting after the cursor position."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, self.cursor.position
+
+        if reverse:
+            queryset = queryset.order_by(*['-' + field for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self.get_position_filter(current_position, reverse))
+
+        # Fetch an extra row to know if there is a following page.
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_position_filter(self, position, reverse):
+        """Return the filter selecting rows strictly after the position."""
+        field, key = self.ordering
+        value, pk = self.decode_position(position)
+        lookup = 'lt' if reverse else 'gt'
+        return (
+            Q(**{'{}__{}'.format(field, lookup): value}) |
+            Q(**{field: value, '{}__{}'.format(key, lookup): pk})
+        )
+
+    def decode_position(self, position):
+        """Split a position into its date time value and primary key."""
+        try:
+            value, pk = position.rsplit(self.position_separator, 1)
+            pk = int(pk)
+            value = parse_datetime(value)
+        except (AttributeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def _get_position_from_instance(self, instance, ordering):
+        """Encode the `(field, pk)` pair of the instance."""
+        values = []
+        for field in ordering:
+            if isinstance(instance, dict):
+                value = instance[field]
+            else:
+                value = getattr(instance, field)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        return self.position_separator.join(values)
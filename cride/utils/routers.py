@@ -0,0 +1,85 @@
+"""Database routers."""
+
+# Django
+from django.conf import settings
+from django.db import connections
+
+# Utilities
+import contextlib
+import random
+import threading
+
+PRIMARY = 'default'
+
+# Statements run on the primary that don't write
+READ_STATEMENTS = ('SELECT', 'BEGIN', 'SAVEPOINT', 'RELEASE', 'ROLLBACK')
+
+_state = threading.local()
+
+
+def reading_replica():
+    """Return whether reads of the current thread go to a replica."""
+    return getattr(_state, 'replica', None) is not None
+
+
+def pin_primary():
+    """Send the remaining reads of the current thread to the primary."""
+    _state.replica = None
+    _state.written = True
+
+
+def pin_on_write(execute, sql, params, many, context):
+    """Execute wrapper pinning the thread to the primary once it writes."""
+    if not sql.lstrip().upper().startswith(READ_STATEMENTS):
+        pin_primary()
+    return execute(sql, params, many, context)
+
+
+@contextlib.contextmanager
+def replica_reads():
+    """Send the reads within the block to one of DATABASE_REPLICAS.
+    A single replica is picked for the whole block so reads are
+    consistent with each other. Any statement writing to the primary
+    pins the rest of the block to it, so it reads its own writes.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    _state.replica = random.choice(replicas) if replicas else None
+    _state.written = False
+    try:
+        with connections[PRIMARY].execute_wrapper(pin_on_write):
+            yield _state
+    finally:
+        _state.replica = None
+
+
+@contextlib.contextmanager
+def primary():
+    """Send the reads within the block to the primary.
+    Used for reads whose result is cached, so a lagging replica
+    never gets stale rows cached for longer than it lags.
+    """
+    replica = getattr(_state, 'replica', None)
+    _state.replica = None
+    try:
+        yield
+    finally:
+        if not getattr(_state, 'written', False):
+            _state.replica = replica
+
+
+class ReplicaRouter(object):
+    """Route reads to replicas within `replica_reads` blocks.
+    Writes, migrations and reads anywhere else go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return getattr(_state, 'replica', None) or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
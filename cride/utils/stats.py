@@ -0,0 +1,74 @@
+"""Stats utilities."""
+
+# Django
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+# Utilities
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StatsUpdate(object):
+    """Stats update.
+    Collect counter increments for several rows and apply each of
+    them with a single `UPDATE ... SET x = x + n` statement, instead of
+    loading the row and saving every column back. Increments are
+    atomic in the database so concurrent updates are never lost.
+
+    Targets can be model instances, whose in-memory counters are kept
+    in sync, or querysets, which spare loading the row at all.
+
+    Rows are updated in the order they are added. Transactions touching
+    several of them must lock the rows in the same order, ride, profile,
+    membership and then circle, or they can deadlock each other.
+    """
+
+    def __init__(self):
+        self.targets = []
+        self.statements = 0
+
+    def add(self, target, **deltas):
+        """Schedule the increments in deltas for the target row(s)."""
+        for pending, pending_deltas in self.targets:
+            if pending is target:
+                for field, delta in deltas.items():
+                    pending_deltas[field] = pending_deltas.get(field, 0) + delta
+                return self
+        self.targets.append((target, dict(deltas)))
+        return self
+
+    def apply(self):
+        """Run the updates and return the number of statements issued."""
+        now = timezone.now()
+        for target, deltas in self.targets:
+            if isinstance(target, QuerySet):
+                queryset = target
+            else:
+                queryset = type(target)._default_manager.filter(pk=target.pk)
+            values = {field: F(field) + delta for field, delta in deltas.items()}
+            if any(field.name == 'modified' for field in queryset.model._meta.fields):
+                values['modified'] = now
+            queryset.update(**values)
+            self.statements += 1
+
+            if not isinstance(target, QuerySet):
+                for field, delta in deltas.items():
+                    setattr(target, field, getattr(target, field) + delta)
+                if 'modified' in values:
+                    target.modified = now
+
+        logger.debug(
+            'Applied %d stats updates, %d queries saved.',
+            self.statements,
+            self.saved_queries
+        )
+        return self.statements
+
+    @property
+    def saved_queries(self):
+        """Queries saved against loading and saving every target row.
+        Instance targets are already loaded, only querysets spare the load.
+        """
+        return sum(1 for target, _ in self.targets if isinstance(target, QuerySet))
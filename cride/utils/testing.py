@@ -0,0 +1,25 @@
+"""Test utilities."""
+
+# Django
+from django.core.cache import cache
+
+# Django REST Framework
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+# Cache
+from cride.circles.cache import circle_resolver
+
+
+def clear_caches():
+    """Drop the shared cache and the circles held by this process."""
+    cache.clear()
+    circle_resolver.get_local().clear()
+
+
+def get_client(user):
+    """Return an API client authenticated as user."""
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=user)
+    client.credentials(HTTP_AUTHORIZATION='Token {}'.format(token.key))
+    return client
@@ -0,0 +1,47 @@
+"""Geohash tests."""
+
+# Django
+from django.test import SimpleTestCase
+
+# Utilities
+from cride.utils.geo import covering_cells, encode_geohash, haversine, prefix_range
+
+
+class PrefixRangeTestCase(SimpleTestCase):
+    """Bounds of the geohash prefix lookups."""
+
+    def test_next_prefix(self):
+        """The upper bound is the following prefix of the same length."""
+        self.assertEqual(prefix_range('9g3qrw'), ('9g3qrw', '9g3qrx'))
+
+    def test_trailing_z(self):
+        """Cells ending in z carry over to the previous character."""
+        self.assertEqual(prefix_range('9g3qrz'), ('9g3qrz', '9g3qs'))
+        self.assertEqual(prefix_range('9zz'), ('9zz', 'b'))
+        self.assertEqual(prefix_range('zz'), ('zz', None))
+        self.assertLess('9g3qrzzzz', '9g3qs')
+        self.assertGreaterEqual('9g3qs0000', '9g3qs')
+
+
+class CoveringCellsTestCase(SimpleTestCase):
+    """Cells covering a radius around a point."""
+
+    def assertCovered(self, cells, latitude, longitude):
+        geohash = encode_geohash(latitude, longitude)
+        self.assertTrue(any(geohash.startswith(cell) for cell in cells), geohash)
+
+    def test_covers_the_radius(self):
+        """Points within the radius fall in one of the cells."""
+        cells = covering_cells(19.4180, -99.15, 500)
+        self.assertLessEqual(len(cells), 16)
+        for latitude, longitude in ((19.4180, -99.15), (19.4220, -99.15), (19.4180, -99.1455)):
+            self.assertCovered(cells, latitude, longitude)
+
+    def test_antimeridian(self):
+        """Radii crossing the antimeridian cover cells on both sides."""
+        for latitude, longitude, other in ((10.0, 179.999, -179.995), (-10.0, -179.999, 179.995)):
+            self.assertLess(haversine(latitude, longitude, latitude, other), 1000)
+            cells = covering_cells(latitude, longitude, 1000)
+            self.assertLessEqual(len(cells), 16)
+            self.assertCovered(cells, latitude, longitude)
+            self.assertCovered(cells, latitude, other)
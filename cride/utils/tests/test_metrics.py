@@ -0,0 +1,50 @@
+"""Metrics tests."""
+
+# Django
+from django.test import SimpleTestCase, TestCase, override_settings
+
+# Prometheus
+from prometheus_client import CollectorRegistry
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
+
+# Metrics
+from cride.utils.metrics import DirectoriesCollector
+
+# Utilities
+import os
+import tempfile
+
+
+class MetricsViewTestCase(TestCase):
+    """Access to the metrics endpoint."""
+
+    def test_token_required(self):
+        """Scrapers must send the token."""
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer test')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_no_token(self):
+        """Metrics are never public."""
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+
+class DirectoriesCollectorTestCase(SimpleTestCase):
+    """Aggregation of the metric files of several containers."""
+
+    def write_counter(self, path, pid, value):
+        """Write a requests counter sample for a process."""
+        values = MmapedDict(os.path.join(path, 'counter_{}.db'.format(pid)))
+        values.write_value(mmap_key('cride_requests', 'cride_requests_total', ['status'], ['200']), value)
+        values.close()
+
+    def test_same_pid(self):
+        """Processes of different containers sharing a PID are all counted."""
+        with tempfile.TemporaryDirectory() as django, tempfile.TemporaryDirectory() as worker:
+            self.write_counter(django, 7, 2)
+            self.write_counter(worker, 7, 3)
+            registry = CollectorRegistry()
+            DirectoriesCollector(registry, [django, worker])
+            self.assertEqual(registry.get_sample_value('cride_requests_total', {'status': '200'}), 5)
@@ -0,0 +1,15 @@
+"""Text utilities."""
+
+# Utilities
+import re
+import unicodedata
+
+
+def normalize_text(value):
+    """Return a lowercase, accent-free and single-spaced version of value.
+    Used to keep searchable columns and search terms comparable
+    without database specific collations.
+    """
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', value).strip().lower()